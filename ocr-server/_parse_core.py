@@ -0,0 +1,57 @@
+"""
+Numeric kernels for the field sheet table parser.
+Why: Row grouping and column classification run over every text box on a
+page. With numba installed they are compiled to machine code at import;
+without it the same functions run as plain NumPy.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _group_rows_loop(ys, y_threshold):
+    """
+    Row id per box for boxes sorted by Y, as one scalar loop for numba.
+    A row is the run of boxes within y_threshold of the row's first box.
+    """
+    row_ids = np.empty(len(ys), dtype=np.int32)
+    row = -1
+    anchor = 0.0
+    for i in range(len(ys)):
+        if row < 0 or ys[i] > anchor + y_threshold:
+            row += 1
+            anchor = ys[i]
+        row_ids[i] = row
+    return row_ids
+
+
+def _group_rows_numpy(ys, y_threshold):
+    """Same row ids as _group_rows_loop, with one binary search per row."""
+    row_ids = np.empty(len(ys), dtype=np.int32)
+    row = 0
+    start = 0
+    while start < len(ys):
+        end = int(np.searchsorted(ys, ys[start] + y_threshold, side="right"))
+        row_ids[start:end] = row
+        row += 1
+        start = end
+    return row_ids
+
+
+def _classify_columns(xs, edges):
+    """Column index per box; -1 for boxes outside the outermost edges."""
+    col_ids = np.searchsorted(edges, xs, side="right") - 1
+    col_ids[col_ids >= len(edges) - 1] = -1
+    return col_ids.astype(np.int32)
+
+
+if njit is not None:
+    group_rows = njit("int32[:](float64[:], float64)", cache=True)(_group_rows_loop)
+    classify_columns = njit("int32[:](float64[:], float64[:])", cache=True)(_classify_columns)
+else:
+    group_rows = _group_rows_numpy
+    classify_columns = _classify_columns
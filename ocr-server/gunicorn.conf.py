@@ -0,0 +1,31 @@
+"""
+Gunicorn settings for the OCR server.
+Why: Unlike `python main.py` (uvicorn's spawned workers), gunicorn forks its
+workers from a master, so a model loaded in the master is shared by all of
+them copy-on-write instead of taking RAM once per worker.
+
+    gunicorn -c gunicorn.conf.py main:app
+"""
+
+import os
+
+bind = "0.0.0.0:8000"
+# Same worker count main.py sizes the OCR thread pools for
+workers = max(1, int(os.environ.get("WEB_CONCURRENCY", 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Import main (and its thread-count env setup) once in the master
+preload_app = True
+# Model loading plus per-worker warm-up can outlast the default 30s
+timeout = 120
+
+
+def when_ready(server):
+    """
+    Load the OCR model in the master, after the app import and before fork.
+    Workers must not build their own PileSheetOCR: get_ocr() in each worker's
+    lifespan returns the inherited instance and only warms it up.
+    """
+    from ocr_processor import preload
+    
+    if preload() is not None:
+        server.log.info("OCR model preloaded for copy-on-write sharing")
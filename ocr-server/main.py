@@ -4,19 +4,69 @@ Why: Provides HTTP endpoint for the Next.js frontend to submit images
 and receive structured OCR data with confidence scores.
 """
 
+import asyncio
 import io
-from typing import List
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import mmap
+import os
+
+# Uvicorn worker processes (uvicorn also reads WEB_CONCURRENCY) and the CPU
+# threads each one may use for OCR.
+# Why: Every worker's OpenMP/MKL pool defaults to os.cpu_count() threads, so
+# N workers oversubscribe the CPU N-fold and thrash caches. Must be set before
+# numpy/Paddle create their thread pools.
+OCR_WORKERS = max(1, int(os.environ.get("WEB_CONCURRENCY", 1)))
+OCR_THREADS = max(1, (os.cpu_count() or 1) // OCR_WORKERS)
+os.environ.setdefault("OMP_NUM_THREADS", str(OCR_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(OCR_THREADS))
+
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+import cv2
+import diskcache
+import numpy as np
+import xxhash
+from fastapi import FastAPI, File, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from multipart.multipart import MultipartParser, parse_options_header
 from PIL import Image
+import pymupdf
 from pydantic import BaseModel
+from starlette.datastructures import Headers
+
+from ocr_processor import (
+    OCR_BACKEND, PADDLE_DET_MODEL, PADDLE_REC_BATCH_SIZE, PADDLE_REC_MODEL, PREDICT_MAX_SIDE, REGION_CROP,
+    decode_image_bytes, get_ocr,
+    _box_centers, _score_array,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the OCR model and run one warm-up inference before serving requests.
+    Why: Otherwise the first request pays for weight loading and kernel selection.
+    """
+    try:
+        # get_ocr() builds the singleton and warms it up
+        app.state.ocr = await asyncio.to_thread(get_ocr)
+        app.state.ocr_error = None
+    except Exception as e:
+        # Keep serving so /health can report why OCR is unavailable
+        app.state.ocr = None
+        app.state.ocr_error = str(e)
+    yield
 
-from ocr_processor import get_ocr
 
 app = FastAPI(
     title="PileTest OCR Server",
     description="Extract readings from handwritten pile load test field sheets",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson serializes the large readings payloads several times faster
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS for local development
@@ -28,6 +78,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Uploads up to this size stay in RAM; larger ones spill to a temp file on disk
+SPOOL_MAX_SIZE = 8 << 20
+
+# Accepted upload content types, as str.startswith() prefixes
+_ALLOWED_PREFIXES = ("image/", "application/pdf")
+
+# Page-level OCR result cache, keyed by a content hash of each page.
+# Why: Re-uploads and repeated pages (cover sheets, headers) skip OCR entirely.
+# Bump OCR_CACHE_VERSION whenever OCR parsing output changes.
+OCR_CACHE_VERSION = 5
+_ocr_cache = diskcache.Cache(
+    os.environ.get("OCR_CACHE_DIR", "/tmp/ocr-cache"),
+    size_limit=int(os.environ.get("OCR_CACHE_SIZE_LIMIT", 512 << 20)),
+)
+
+# Caps concurrent OCR pipelines (each holds its rendered pages in memory).
+# Inference itself is serialized per engine by PileSheetOCR.predict_raw(),
+# except on ONNX Runtime, whose sessions run requests concurrently
+_ocr_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+# OpenAPI description of the streamed /extract body (FastAPI can't infer it
+# because the endpoint reads the raw request stream instead of File params)
+_FILES_REQUEST_BODY = {
+    "required": True,
+    "content": {
+        "multipart/form-data": {
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "files": {
+                        "type": "array",
+                        "items": {"type": "string", "format": "binary"},
+                    }
+                },
+                "required": ["files"],
+            }
+        }
+    },
+}
+
 
 class OCRValueResponse(BaseModel):
     """Single value with confidence score."""
@@ -80,52 +170,55 @@ async def root():
 
 
 @app.get("/health")
-async def health():
+async def health(request: Request):
     """Detailed health check."""
-    try:
-        ocr = get_ocr()
-        return {
-            "status": "healthy",
-            "ocr_ready": ocr is not None
-        }
-    except Exception as e:
+    if request.app.state.ocr_error is not None:
         return {
             "status": "healthy",
             "ocr_ready": False,
-            "ocr_error": str(e)
+            "ocr_error": request.app.state.ocr_error
         }
+    return {
+        "status": "healthy",
+        "ocr_ready": request.app.state.ocr is not None
+    }
+
+
+def loaded_ocr(request: Request):
+    """Return the OCR model preloaded at startup, or 503 if it failed to load."""
+    ocr = request.app.state.ocr
+    if ocr is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"OCR model unavailable: {request.app.state.ocr_error}"
+        )
+    return ocr
 
 
 @app.post("/debug-ocr")
-async def debug_ocr(files: List[UploadFile] = File(...)):
+async def debug_ocr(request: Request, files: List[UploadFile] = File(...)):
     """
     Debug endpoint to see raw PaddleOCR output.
     Why: Helps diagnose OCR parsing issues by showing the raw model output.
     """
-    import numpy as np
-    
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
     
-    ocr = get_ocr()
+    ocr = loaded_ocr(request)
     file = files[0]
     
     try:
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        if image.mode != "RGB":
-            image = image.convert("RGB")
+        # Decode exactly as /extract does (BGR), so the raw output matches it
+        img_array = decode_image(file.file)
+        height, width = img_array.shape[:2]
         
-        img_array = np.array(image)
-        
-        # Get raw OCR result
-        raw_result = ocr.ocr.predict(img_array)
+        # Get raw OCR result, off the event loop and behind the engine's lock
+        raw_result = await asyncio.to_thread(ocr.predict_raw, img_array)
         
         # Analyze the result structure
         debug_info = {
-            "image_size": image.size,
-            "image_mode": image.mode,
+            "image_size": (width, height),
+            "image_mode": "BGR",
             "result_type": str(type(raw_result)),
             "result_length": len(raw_result) if raw_result else 0,
             "result_structure": [],
@@ -166,30 +259,14 @@ async def debug_ocr(files: List[UploadFile] = File(...)):
                 res_info["rec_scores_count"] = len(rec_scores)
                 res_info["rec_polys_count"] = len(rec_polys)
                 
+                # Center positions and scores as the parser computes them,
+                # with its per-box (0, 0) / 0.0 fallback for bad entries
+                n = len(rec_texts)
+                centers = _box_centers(rec_polys, n)
+                scores = _score_array(rec_scores, n)
+                
                 # Extract text with positions
-                for j in range(len(rec_texts)):
-                    text = rec_texts[j] if j < len(rec_texts) else ""
-                    score = rec_scores[j] if j < len(rec_scores) else 0
-                    poly = rec_polys[j] if j < len(rec_polys) else []
-                    
-                    # Calculate center position
-                    if poly is not None and len(poly) >= 4:
-                        try:
-                            # Handle different poly formats
-                            if hasattr(poly, 'tolist'):
-                                poly = poly.tolist()
-                            if isinstance(poly[0], (list, tuple)):
-                                center_x = sum(p[0] for p in poly) / len(poly)
-                                center_y = sum(p[1] for p in poly) / len(poly)
-                            else:
-                                # Flat format [x1,y1,x2,y2,x3,y3,x4,y4]
-                                center_x = (poly[0] + poly[2] + poly[4] + poly[6]) / 4
-                                center_y = (poly[1] + poly[3] + poly[5] + poly[7]) / 4
-                        except:
-                            center_x, center_y = 0, 0
-                    else:
-                        center_x, center_y = 0, 0
-                    
+                for text, score, (center_x, center_y) in zip(rec_texts, scores.tolist(), centers.tolist()):
                     if text:
                         debug_info["all_detected_text"].append({
                             "text": str(text),
@@ -217,66 +294,211 @@ async def debug_ocr(files: List[UploadFile] = File(...)):
         }
 
 
-@app.post("/extract", response_model=ExtractResponse)
-async def extract_readings(files: List[UploadFile] = File(...)):
+async def read_multipart_files(request: Request) -> List[UploadFile]:
+    """
+    Stream a multipart/form-data body into spooled temp files, one per file part.
+    Why: Parsing the body incrementally from request.stream() avoids holding
+    every upload fully in memory (plus a second copy) before OCR can start.
+    Small files stay in RAM; large ones spill to disk.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+    
+    files: List[UploadFile] = []
+    part_headers: dict = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    current: Optional[SpooledTemporaryFile] = None
+    
+    def on_part_begin():
+        part_headers.clear()
+    
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+    
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+    
+    def on_header_end():
+        part_headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+    
+    def on_headers_finished():
+        nonlocal current
+        _, disposition = parse_options_header(part_headers.get(b"content-disposition", b""))
+        filename = disposition.get(b"filename")
+        # Only file parts of the "files" field are collected; other fields are ignored
+        if disposition.get(b"name") != b"files" or filename is None:
+            current = None
+            return
+        current = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        files.append(UploadFile(
+            file=current,
+            filename=filename.decode("utf-8", "replace"),
+            headers=Headers({
+                "content-type": part_headers.get(b"content-type", b"").decode("latin-1")
+            }),
+        ))
+    
+    def on_part_data(data: bytes, start: int, end: int):
+        if current is not None:
+            current.write(data[start:end])
+    
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+    })
+    
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except Exception as e:
+        for file in files:
+            file.file.close()
+        raise HTTPException(status_code=400, detail=f"Malformed multipart upload: {str(e)}")
+    
+    for file in files:
+        file.file.seek(0)
+    
+    return files
+
+
+@app.post("/extract", openapi_extra={"requestBody": _FILES_REQUEST_BODY})
+async def extract_readings(request: Request):
     """
     Extract readings from uploaded field sheet images.
     
     Why: Main endpoint that processes multiple pages of handwritten data,
     combines them into a single chronological reading set, and returns
-    structured data with per-value confidence scores.
+    structured data with per-value confidence scores. The plain dict is
+    serialized by orjson directly, skipping response_model validation.
     
     Args:
-        files: List of image files (JPG, PNG, WebP) or PDFs
+        request: multipart/form-data request whose "files" parts are
+            image files (JPG, PNG, WebP) or PDFs
         
     Returns:
-        ExtractResponse with project info, readings, and metadata
+        Dict with project info, readings, and metadata (ExtractResponse shape)
     """
+    return await extract_from_request(request)
+
+
+@app.post(
+    "/extract-validated",
+    response_model=ExtractResponse,
+    openapi_extra={"requestBody": _FILES_REQUEST_BODY}
+)
+async def extract_readings_validated(request: Request):
+    """
+    Same as /extract, but validated against the ExtractResponse schema.
+    Why: Useful when debugging the response contract; /extract skips this cost.
+    """
+    return await extract_from_request(request)
+
+
+async def extract_from_request(request: Request) -> dict:
+    """
+    Run OCR over every uploaded file and merge the results.
+    Why: Shared by /extract and /extract-validated.
+    """
+    files = await read_multipart_files(request)
+    
     if not files:
         raise HTTPException(status_code=400, detail="No files provided")
     
-    ocr = get_ocr()
+    ocr = loaded_ocr(request)
     all_readings = []
     project_info = {}
     
-    for i, file in enumerate(files):
-        # Validate file type
-        content_type = file.content_type or ""
-        if not any(t in content_type for t in ["image/", "application/pdf"]):
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid file type: {content_type}. Only images and PDFs are supported."
-            )
-        
-        try:
-            contents = await file.read()
+    # (filename, cache key) for every page, in upload order
+    pages = []
+    # cache key -> OCR result, for cache hits and finished OCR
+    results = {}
+    # cache key -> filename for pages that still need OCR, in OCR order
+    pending = {}
+    
+    def uncached_pages():
+        """
+        Yield each page that misses the cache, decoded for OCR.
+        Why: Runs on the OCR render thread, so PDF pages are rasterized while
+        earlier pages are already in predict().
+        """
+        for file in files:
+            try:
+                # Handle PDF files
+                if "pdf" in (file.content_type or ""):
+                    with upload_buffer(file.file) as pdf_bytes:
+                        yield from pages_to_ocr(file.filename, iter_pdf_pages(pdf_bytes))
+                else:
+                    # Images are keyed by their raw bytes, so cache hits skip decoding
+                    yield from pages_to_ocr(file.filename, [(hash_stream(file.file), file.file)])
+            except Exception as e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error processing file {file.filename}: {str(e)}"
+                )
+    
+    def pages_to_ocr(filename: str, page_sources: Iterable[Tuple[str, Any]]):
+        """Record every page, collect cache hits, and yield prepared cache misses."""
+        for key, source in page_sources:
+            pages.append((filename, key))
+            if key in results or key in pending:
+                continue
             
-            # Handle PDF files
-            if "pdf" in content_type:
-                images = pdf_to_images(contents)
+            cached = _ocr_cache.get(key)
+            if cached is not None:
+                results[key] = cached
             else:
-                images = [Image.open(io.BytesIO(contents))]
-            
-            # Process each page/image
-            for img in images:
-                # Convert to RGB if necessary
-                if img.mode != "RGB":
-                    img = img.convert("RGB")
-                
-                result = ocr.extract_from_image(img)
-                
-                # Merge project info (first page takes precedence)
-                if not project_info and result["project_info"]:
-                    project_info = result["project_info"]
-                
-                # Collect all readings
-                all_readings.extend(result["readings"])
-                
+                pending[key] = filename
+                yield prepare_page(source)
+    
+    try:
+        # Validate file types before any rendering starts
+        for file in files:
+            content_type = file.content_type or ""
+            if not content_type.startswith(_ALLOWED_PREFIXES):
+                raise HTTPException(
+                    status_code=400, 
+                    detail=f"Invalid file type: {content_type}. Only images and PDFs are supported."
+                )
+        
+        # Render, OCR and parse uncached pages as one pipeline, off the event loop
+        try:
+            ocr_results = await run_ocr(ocr, uncached_pages())
+        except HTTPException:
+            raise
         except Exception as e:
+            filenames = ", ".join(dict.fromkeys(pending.values()))
             raise HTTPException(
                 status_code=500,
-                detail=f"Error processing file {file.filename}: {str(e)}"
+                detail=f"Error processing file {filenames}: {str(e)}"
             )
+    finally:
+        for file in files:
+            file.file.close()
+    
+    for key, result in zip(pending, ocr_results):
+        results[key] = {"project_info": result["project_info"], "readings": result["readings"]}
+        _ocr_cache.set(key, results[key])
+    
+    # Merge in page order so the first page's project info wins
+    for _, key in pages:
+        result = results[key]
+        
+        # Merge project info (first page takes precedence)
+        if not project_info and result["project_info"]:
+            project_info = result["project_info"]
+        
+        # Collect all readings
+        all_readings.extend(result["readings"])
     
     # Sort all readings by time (handles multi-page merge)
     all_readings = sort_readings_by_time(all_readings)
@@ -284,27 +506,103 @@ async def extract_readings(files: List[UploadFile] = File(...)):
     # Deduplicate readings with same time (keep higher confidence)
     all_readings = deduplicate_readings(all_readings)
     
-    return ExtractResponse(
-        project_info=project_info,
-        readings=all_readings,
-        page_count=len(files),
-        total_readings=len(all_readings)
-    )
+    return {
+        "project_info": project_info,
+        "readings": all_readings,
+        "page_count": len(files),
+        "total_readings": len(all_readings)
+    }
+
+
+async def run_ocr(ocr, pages: Iterable[np.ndarray]) -> List[dict]:
+    """
+    Run batched OCR for a request's pages, produced lazily, in a worker thread.
+    Why: Keeps the event loop free so requests overlap, while the
+    semaphore bounds how many pipelines run at once.
+    """
+    async with _ocr_semaphore:
+        return await asyncio.to_thread(ocr.extract_from_page_stream, pages)
+
+
+# OCR settings that change results, so pages cached under other settings miss
+_OCR_CACHE_SETTINGS = (
+    f"{OCR_BACKEND}:crop{int(REGION_CROP)}:side{PREDICT_MAX_SIDE}:rec{PADDLE_REC_BATCH_SIZE or 0}"
+    + (f":{PADDLE_DET_MODEL}:{PADDLE_REC_MODEL}" if OCR_BACKEND == "paddle" else "")
+)
+
+
+def page_cache_key(digest: str) -> str:
+    """Namespace a content digest by cache version, OCR backend and settings."""
+    return f"v{OCR_CACHE_VERSION}:{_OCR_CACHE_SETTINGS}:{digest}"
+
+
+@contextmanager
+def upload_buffer(stream: BinaryIO):
+    """
+    Expose a spooled upload's bytes as a memoryview, without copying them.
+    Why: read() would allocate a second copy of the whole upload. In-memory
+    spools share their BytesIO buffer; spools rolled to disk are mmapped.
+    The view is released on exit so the upload can be closed.
+    """
+    raw = getattr(stream, "_file", stream)
+    if isinstance(raw, io.BytesIO):
+        with raw.getbuffer() as buf:
+            yield buf
+    else:
+        with mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as buf:
+            yield buf
+
+
+def hash_stream(stream: BinaryIO) -> str:
+    """
+    Hash an upload in place.
+    Why: xxh3_128 runs at GB/s straight over the upload buffer, with no bytes copy.
+    """
+    with upload_buffer(stream) as buf:
+        return page_cache_key(xxhash.xxh3_128_hexdigest(buf))
 
 
-def pdf_to_images(pdf_bytes: bytes) -> List[Image.Image]:
+def prepare_page(source) -> np.ndarray:
     """
-    Convert PDF bytes to list of PIL Images.
-    Why: PaddleOCR works on images, so PDFs need conversion.
+    Decode (if needed) one page for OCR, as a BGR uint8 array.
+    Why: Only pages that miss the cache pay for this work. Pages keep their
+    full size: the parser's column and header limits are page pixel positions,
+    and PileSheetOCR already shrinks what predict() sees and maps the
+    polygons back (PREDICT_MAX_SIDE).
+    """
+    return source if isinstance(source, np.ndarray) else decode_image(source)
+
+
+def decode_image(stream: BinaryIO) -> np.ndarray:
+    """
+    Decode an uploaded image straight to a BGR uint8 array.
+    Why: One libjpeg-turbo/libpng pass with cv2.imdecode replaces PIL's
+    decode + convert("RGB") + np.array copy, and PaddleOCR expects BGR anyway.
+    """
+    with upload_buffer(stream) as buf:
+        img = decode_image_bytes(buf)
+    if img is None:
+        # Formats OpenCV can't decode (e.g. GIF) still go through PIL
+        img = cv2.cvtColor(np.asarray(Image.open(stream).convert("RGB")), cv2.COLOR_RGB2BGR)
+    return img
+
+
+def iter_pdf_pages(pdf_bytes: memoryview) -> Iterator[Tuple[str, np.ndarray]]:
+    """
+    Render PDF bytes to (cache key, BGR image array) pairs, one page at a time.
+    Why: PaddleOCR works on images, so PDFs need conversion. PyMuPDF renders
+    in-process straight to a pixmap, with no poppler subprocess or PPM pipe.
+    Yielding per page lets OCR start before the last page is rendered.
+    Each page is keyed by a hash of its rendered pixels.
     """
     try:
-        from pdf2image import convert_from_bytes
-        return convert_from_bytes(pdf_bytes, dpi=200)
-    except ImportError:
-        raise HTTPException(
-            status_code=500,
-            detail="PDF support requires pdf2image and poppler. Please install them."
-        )
+        with pymupdf.open(stream=pdf_bytes, filetype="pdf") as doc:
+            for page in doc:
+                pix = page.get_pixmap(dpi=200, alpha=False)
+                # samples_mv is a memoryview over the pixmap, avoiding a bytes copy
+                key = page_cache_key(xxhash.xxh3_128_hexdigest(pix.samples_mv))
+                rgb = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, 3)
+                yield key, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -312,36 +610,66 @@ def pdf_to_images(pdf_bytes: bytes) -> List[Image.Image]:
         )
 
 
+# Sort key layout for sort_readings_by_time: (DDMM date, hours, minutes)
+_TIME_SORT_DTYPE = np.dtype([("d", "i4"), ("h", "i4"), ("m", "i4")])
+
+
+@lru_cache(maxsize=8192)
+def _parse_sort_time(time_str) -> Tuple[int, int]:
+    """
+    (hours, minutes) of a reading's time cell, (0, 0) when unreadable.
+    Why: Field sheets repeat the same time grid ("9:00", "9:15", ...) across
+    readings and pages, so most lookups hit the cache instead of re-parsing.
+    """
+    try:
+        parts = str(time_str).replace(".", ":").split(":")
+        hours = int(parts[0])
+        minutes = int(parts[1]) if len(parts) > 1 else 0
+    except (ValueError, IndexError):
+        hours, minutes = 0, 0
+    return hours, minutes
+
+
+@lru_cache(maxsize=8192)
+def _parse_sort_date(date_str) -> int:
+    """DD/MM/YYYY date cell as DD * 100 + MM for sorting, 0 when unreadable."""
+    # Simple date parsing (DD/MM/YYYY)
+    date_val = 0
+    if date_str:
+        try:
+            parts = date_str.split("/")
+            if len(parts) >= 2:
+                date_val = int(parts[0]) * 100 + int(parts[1])
+        except ValueError:
+            pass
+    return date_val
+
+
 def sort_readings_by_time(readings: list) -> list:
     """
     Sort readings chronologically, handling day boundaries.
     Why: Multi-page documents may span multiple days, need proper ordering.
+    Keys are parsed once per reading into a NumPy structured array and
+    ordered with a single stable argsort.
     """
     def time_sort_key(reading: dict) -> tuple:
         time_str = reading.get("time", {}).get("value", "0:00")
         date_str = reading.get("date", {}).get("value", "")
-        
-        # Parse time
-        try:
-            parts = str(time_str).replace(".", ":").split(":")
-            hours = int(parts[0])
-            minutes = int(parts[1]) if len(parts) > 1 else 0
-        except (ValueError, IndexError):
-            hours, minutes = 0, 0
-        
-        # Simple date parsing (DD/MM/YYYY)
-        date_val = 0
-        if date_str:
-            try:
-                parts = date_str.split("/")
-                if len(parts) >= 2:
-                    date_val = int(parts[0]) * 100 + int(parts[1])
-            except ValueError:
-                pass
-        
-        return (date_val, hours, minutes)
+        return (_parse_sort_date(date_str), *_parse_sort_time(time_str))
     
-    return sorted(readings, key=time_sort_key)
+    keys = np.array([time_sort_key(r) for r in readings], dtype=_TIME_SORT_DTYPE)
+    order = np.argsort(keys, order=("d", "h", "m"), kind="stable")
+    return [readings[i] for i in order]
+
+
+# Dial gauge fields compared when deduplicating readings
+_GAUGES = ("gauge1", "gauge2", "gauge3", "gauge4")
+
+
+def _gauge_confidence_sum(reading: dict) -> float:
+    """Sum of the four gauge confidences (compared as sums, no /4 needed)."""
+    get = reading.get
+    return sum(get(f, {}).get("confidence", 0) for f in _GAUGES)
 
 
 def deduplicate_readings(readings: list) -> list:
@@ -349,34 +677,26 @@ def deduplicate_readings(readings: list) -> list:
     Remove duplicate readings, keeping higher confidence values.
     Why: Multi-page scans might have overlapping data at page boundaries.
     """
+    # key -> (reading, gauge confidence sum), so each sum is computed once
     seen = {}
     
     for reading in readings:
-        time_key = reading.get("time", {}).get("value", "")
-        pressure_key = reading.get("pressure", {}).get("value", 0)
-        key = f"{time_key}_{pressure_key}"
+        get = reading.get
+        # A tuple key hashes without string formatting and can't collide
+        # the way "10_0" / "1_00" style joined strings could
+        key = (get("time", {}).get("value", ""), get("pressure", {}).get("value", 0))
+        conf_sum = _gauge_confidence_sum(reading)
         
-        if key not in seen:
-            seen[key] = reading
-        else:
-            # Keep the one with higher average confidence
-            existing = seen[key]
-            existing_conf = sum(
-                existing.get(f, {}).get("confidence", 0) 
-                for f in ["gauge1", "gauge2", "gauge3", "gauge4"]
-            ) / 4
-            new_conf = sum(
-                reading.get(f, {}).get("confidence", 0) 
-                for f in ["gauge1", "gauge2", "gauge3", "gauge4"]
-            ) / 4
-            
-            if new_conf > existing_conf:
-                seen[key] = reading
+        # Keep the one with higher average confidence
+        existing = seen.get(key)
+        if existing is None or conf_sum > existing[1]:
+            seen[key] = (reading, conf_sum)
     
-    return list(seen.values())
+    return [reading for reading, _ in seen.values()]
 
 
 if __name__ == "__main__":
+    # Single-host dev entry point; gunicorn.conf.py shares one model across workers
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=OCR_WORKERS)
 
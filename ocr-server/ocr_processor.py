@@ -4,15 +4,189 @@ Why: Extracts structured data (time, pressure, gauge readings) from handwritten
 field sheets using PaddleOCR, returning values with confidence scores.
 """
 
+import bisect
+import logging
+import os
+import queue
 import re
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
-from paddleocr import PaddleOCR
+from itertools import accumulate
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Tuple
 from PIL import Image
+import cv2
 import numpy as np
 
+try:
+    import re2 as _header_re  # google-re2: linear-time automaton, same API as re
+except ImportError:
+    _header_re = re
 
-@dataclass
+from _parse_core import classify_columns, group_rows
+from onnx_engine import DET_MODEL_FILE, OnnxOCREngine
+
+logger = logging.getLogger(__name__)
+
+
+ONNX_MODEL_DIR = os.environ.get(
+    "PILE_OCR_ONNX_DIR", str(Path(__file__).parent / "models" / "onnx-int8")
+)
+
+# Inference backend: "paddle" (PaddleOCR runtime), or "onnx" / "openvino" to run
+# the INT8 models produced by quantize_models.py on ONNX Runtime / OpenVINO.
+# Defaults to ONNX Runtime once exported models exist, else PaddleOCR.
+OCR_BACKEND = os.environ.get("PILE_OCR_BACKEND") or (
+    "onnx" if (Path(ONNX_MODEL_DIR) / DET_MODEL_FILE).exists() else "paddle"
+)
+
+# Pre-downloaded PP-OCRv5 det/rec weights (baked into the Docker image). Each
+# of det/ and rec/ that exists is loaded directly, skipping the download check.
+PADDLE_MODEL_DIR = Path(os.environ.get("PILE_OCR_PADDLE_MODEL_DIR", "/opt/models"))
+# Det/rec models PaddleOCR loads, by name rather than picked from `lang`, so the
+# Dockerfile can copy exactly these from the download cache into PADDLE_MODEL_DIR
+PADDLE_DET_MODEL = os.environ.get("PILE_OCR_DET_MODEL", "PP-OCRv5_server_det")
+PADDLE_REC_MODEL = os.environ.get("PILE_OCR_REC_MODEL", "PP-OCRv5_server_rec")
+
+# Paddle Inference CPU math threads; main.py sets OMP_NUM_THREADS per worker
+PADDLE_CPU_THREADS = int(os.environ.get("OMP_NUM_THREADS") or max(1, (os.cpu_count() or 2) // 2))
+
+# Opt-in: PaddleOCR 3.x high-performance inference, which picks OpenVINO /
+# ONNX Runtime / TensorRT per model. Needs `paddleocr install_hpi_deps cpu|gpu`
+# (not in requirements.txt); when the plugin is missing or unsupported here,
+# PileSheetOCR logs a warning and falls back to plain Paddle Inference.
+PADDLE_ENABLE_HPI = os.environ.get("PILE_OCR_HPI", "0") == "1"
+# FP16 inference on GPU (CPU always runs FP32)
+PADDLE_FP16 = os.environ.get("PILE_OCR_FP16", "1") == "1"
+# Text lines per recognizer call. Each batch slot holds its own arena, so CPU
+# hosts default to 1 (far lower peak memory, same accuracy) and GPUs to 6
+PADDLE_REC_BATCH_SIZE = int(os.environ.get("PILE_OCR_REC_BATCH_SIZE", 0)) or None
+
+# Opt-in: OCR only the parts of a sheet the parser reads - the header band
+# (full width) and the date..gauge4 columns below it - as two crops, instead
+# of the whole page. Skips recognizing the average/signature/remark columns.
+# Off by default: those boxes no longer count towards a row's 4-box minimum.
+REGION_CROP = os.environ.get("PILE_OCR_REGION_CROP", "0") == "1"
+HEADER_SPLIT_Y = 300   # header parser's y < 300 band; table-crop boxes start here
+TABLE_RIGHT_X = 1060   # right edge of the gauge4 column
+REGION_CROP_PAD = 40   # crop overlap so text on a crop edge is seen whole
+
+# Pages per predict() call; parsing of one batch overlaps inference of the next.
+# Raise PILE_OCR_BATCH_SIZE on GPUs with VRAM to spare
+PREDICT_BATCH_SIZE = max(1, int(os.environ.get("PILE_OCR_BATCH_SIZE", 4)))
+
+# Pages OCR'd concurrently by extract_from_page_stream on engines whose
+# sessions are safe to call from several threads (ONNX Runtime)
+PARALLEL_PAGES = min(os.cpu_count() or 1, 8)
+
+# Fewest pages for which batch_extract() resizes to one shape; below this,
+# sequential batches beat the extra resize and warm-up pass
+UNIFORM_BATCH_MIN = 15
+
+# Longest a streamed page waits for its batch to fill before predict() runs
+STREAM_MAX_WAIT = 0.2
+_STREAM_END = object()
+
+# Longest side the text detector resizes pages to (matches onnx_engine)
+DET_LIMIT_SIDE_LEN = 960
+
+# Pages are shrunk to this longest side before predict() and the returned
+# polygons scaled back, so parsing stays in the ~2000px calibration space.
+# Why: The detector only sees 960px anyway; less data moves through the
+# engine's pre-processing and recognition crops. 0 disables.
+PREDICT_MAX_SIDE = int(os.environ.get("PILE_OCR_PREDICT_MAX_SIDE", 1280))
+
+# Header field patterns, tried in order per field (first match wins)
+HEADER_FIELD_PATTERNS = {
+    "test_no": [r"TEST\s*NO[:\.\-]?\s*(.+)", r"P\.\s*\d+\s*/\s*\d+"],
+    "project": [r"PROJECT[:\.\-]?\s*(.+)"],
+    "location": [r"LOCATION[:\.\-]?\s*(.+)"],
+    "contractor": [r"CONTRACTOR[:\.\-]?\s*(.+)"],
+    "client_name": [r"CLIENT[S']?\s*NAME[:\.\-]?\s*(.+)"],
+    "pile_diameter": [r"PILE\s*DIAMETER[:\.\-]?\s*(.+)", r"(\d+)\s*mm"],
+    "design_load": [r"DESIGN\s*LOAD[:\.\-]?\s*(.+)", r"(\d+)\s*MT"],
+    "test_load": [r"TEST\s*LOAD[:\.\-]?\s*(.+)"],
+    "ram_area": [r"RAM\s*AREA[:\.\-]?\s*(.+)", r"(\d+)\s*cm"],
+    "date_of_casting": [r"DATE\s*OF\s*CASTING[:\.\-]?\s*(.+)"],
+    "pile_depth": [r"PILE\s*DEPTH[:\.\-]?\s*(.+)"],
+    "lc_dial_gauge": [r"L\.?C\.?\s*OF\s*DIAL\s*GAUGE[:\.\-]?\s*(.+)"],
+    "test_type": [r"TYPE\s*OF\s*TEST[:\.\-]?\s*(.+)", r"(RVPLT|IVPLT|PULLOUT|LATERAL)"],
+    "mixed_design": [r"MIXED\s*DESIGN[:\.\-]?\s*(.+)", r"(M\s*-?\s*\d+)"],
+}
+
+
+def _compile_field_patterns(field_patterns: list) -> tuple:
+    """
+    Fold one field's fallback patterns into a single anchored regex.
+    Why: One match() per field replaces a search() per pattern. Alternative k
+    is `.*?(?P<_k>pattern)` anchored at the start, so it only runs once the
+    earlier patterns failed anywhere in the text and still finds its pattern's
+    leftmost match, exactly like trying each pattern's search() in turn.
+    Returns (lowercase regex, case-insensitive regex, [(outer group, value
+    group) per alternative]); both regexes share the same group numbers.
+    """
+    def combine(patterns):
+        alternatives = [f"(?s:.*?)(?P<_{k}>{p})" for k, p in enumerate(patterns)]
+        return r"\A(?:" + "|".join(alternatives) + ")"
+    
+    # Header text is lowercased once per page, so its regex needs no case
+    # folding (the field patterns only use lowercase escapes like \s and \d)
+    lower_regex = _header_re.compile(combine([p.lower() for p in field_patterns]))
+    regex = _header_re.compile("(?i)" + combine(field_patterns))
+    groups = []
+    for k, p in enumerate(field_patterns):
+        outer = regex.groupindex[f"_{k}"]
+        # A pattern's own capture group holds the value; otherwise the whole match
+        groups.append((outer, outer + 1 if re.compile(p).groups else outer))
+    return lower_regex, regex, groups
+
+
+_HEADER_PATTERNS = {
+    field: _compile_field_patterns(field_patterns)
+    for field, field_patterns in HEADER_FIELD_PATTERNS.items()
+}
+
+# Table cell patterns - handle various formats from OCR; used with
+# fullmatch() on stripped cell text, so they need no ^...$ anchors
+_TIME_RE = re.compile(r"\d{1,2}[:\.\-!\·]\d{2}")
+_TIME_SEP_RE = re.compile(r"[:\.\-!\·]")
+_DATE_RE = re.compile(r"\d{2,6}[/]?\d{0,4}")  # DD/MM or DDMMYY
+# A run of letters in a numeric cell means it may be header text ("DESIGN LOAD
+# 147 MT") that straddles a column; such cells still parse but aren't claimed
+_WORD_RE = re.compile(r"[A-Za-z]{2,}")
+
+# Common OCR misreads in numeric cells: "·"/"-"/"r" -> ".", "!" -> ":", and
+# other stray letters dropped. "r" comes after the letters so it maps to "."
+_CLEAN_TRANS = str.maketrans({
+    **{c: None for c in string.ascii_letters},
+    "·": ".", "!": ":", "-": ".", "r": ".",
+})
+
+# Table column boundaries in X (calibrated from actual field sheets, ~2000px
+# width, standard ZedGeo layout). Column i spans [_COLUMN_EDGES[i], _COLUMN_EDGES[i+1]):
+# DATE (x < 130), TIME (x ~ 162), PRESSURE kg/cm² (x ~ 266), LOAD IN MT
+# (x ~ 405, skipped), Readings 1-2 on the test pile (x ~ 535, 681) and
+# Readings 3-4 on the reaction pile (x ~ 811, 943).
+_COLUMN_EDGES = np.array([0, 130, 220, 350, 500, 640, 780, 920, 1060], dtype=np.float64)
+_COLUMN_NAMES = ["date", "time", "pressure", "load", "gauge1", "gauge2", "gauge3", "gauge4"]
+
+# Fields of a parsed reading in output order, as field -> (value, confidence)
+# for cells the row does not fill
+_EMPTY_READING = {
+    **{field: (None, 0.0) for field in ("date", "time", "pressure", "gauge1", "gauge2", "gauge3", "gauge4")},
+    "remark": (None, 1.0),
+}
+
+# Largest plausible value per column, indexed like _COLUMN_NAMES plus a final
+# NaN for boxes outside the table (column -1): pressure in kg/cm² up to 300,
+# dial gauges (typically 0-20mm) up to 50; NaN marks non-numeric columns
+_COLUMN_MAX = np.array([np.nan, np.nan, 300, np.nan, 50, 50, 50, 50, np.nan])
+
+
+@dataclass(slots=True, frozen=True)
 class OCRValue:
     """
     A single extracted value with its confidence score.
@@ -20,9 +194,13 @@ class OCRValue:
     """
     value: any
     confidence: float
+    
+    def as_dict(self) -> dict:
+        """The {"value", "confidence"} dict shape the API responses use."""
+        return {"value": self.value, "confidence": self.confidence}
 
 
-@dataclass 
+@dataclass(slots=True, frozen=True)
 class ExtractedReading:
     """
     A single row of readings from the field sheet.
@@ -38,7 +216,7 @@ class ExtractedReading:
     remark: OCRValue
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ProjectInfo:
     """
     Header metadata extracted from the field sheet.
@@ -60,6 +238,32 @@ class ProjectInfo:
     mixed_design: OCRValue
 
 
+@dataclass(slots=True)
+class TextBoxes:
+    """
+    Detected text boxes as parallel columns (structure of arrays).
+    Why: Filtering, sorting and row grouping run as NumPy operations on
+    contiguous coordinate arrays instead of walking a list of per-box dicts.
+    """
+    texts: list
+    confs: np.ndarray
+    xs: np.ndarray
+    ys: np.ndarray
+    
+    def take(self, indices: np.ndarray) -> "TextBoxes":
+        """Select (and reorder) boxes by index."""
+        return TextBoxes(
+            [self.texts[i] for i in indices.tolist()],
+            self.confs[indices],
+            self.xs[indices],
+            self.ys[indices],
+        )
+    
+    def slice(self, start: int, stop: int) -> "TextBoxes":
+        """Select a contiguous run of boxes; the arrays are views, not copies."""
+        return TextBoxes(self.texts[start:stop], self.confs[start:stop], self.xs[start:stop], self.ys[start:stop])
+
+
 class PileSheetOCR:
     """
     PaddleOCR wrapper specialized for pile load test field sheets.
@@ -67,350 +271,758 @@ class PileSheetOCR:
     used in ZedGeo/standard pile test data sheets.
     """
     
-    def __init__(self):
+    def __init__(self, backend: str = OCR_BACKEND, rec_batch_size: Optional[int] = PADDLE_REC_BATCH_SIZE):
+        # (batch size, page shape) pairs batch_extract() has already warmed up
+        self._warmed_shapes = set()
+        # Serializes predict() across request threads; None where the engine
+        # may run concurrently
+        self._predict_lock = threading.Lock()
+        
+        if backend in ("onnx", "openvino"):
+            # INT8-quantized PP-OCR det/rec on ONNX Runtime or OpenVINO
+            # (same predict() output as PaddleOCR)
+            runtime = "openvino" if backend == "openvino" else "onnxruntime"
+            self.ocr = OnnxOCREngine(ONNX_MODEL_DIR, runtime=runtime)
+            # ORT InferenceSession.run() is thread-safe and releases the GIL;
+            # the pool size caps concurrent page runs across all requests
+            self._pool = (
+                ThreadPoolExecutor(max_workers=PARALLEL_PAGES, thread_name_prefix="ocr-page")
+                if runtime == "onnxruntime" else None
+            )
+            if runtime == "onnxruntime":
+                self._predict_lock = None
+            return
+        
+        # Paddle (and OpenVINO) predictors aren't safe to share across threads
+        self._pool = None
+        
+        from paddleocr import PaddleOCR
+        
+        device = _paddle_device()
+        if device.startswith("gpu"):
+            import paddle
+            
+            # cuDNN benchmark mode: time candidate conv kernels on the first
+            # run of each input shape and reuse the fastest afterwards
+            paddle.set_flags({"FLAGS_cudnn_exhaustive_search": True})
+        
         # Initialize PaddleOCR 3.x with minimal preprocessing
         # Disable extra preprocessing for faster inference on field sheets
-        self.ocr = PaddleOCR(
+        # oneDNN (MKLDNN) picks AVX2/AVX-512 kernels; capping the detector's
+        # long side at 960px keeps input shapes, and so cached kernels, stable
+        options = dict(
             ocr_version="PP-OCRv5",
             use_doc_orientation_classify=False,
             use_doc_unwarping=False,
             use_textline_orientation=False,
-            lang='en'
+            lang='en',
+            device=device,
+            enable_mkldnn=True,
+            cpu_threads=PADDLE_CPU_THREADS,
+            text_det_limit_side_len=DET_LIMIT_SIDE_LEN,
+            text_det_limit_type="max",
+            precision="fp16" if PADDLE_FP16 and device.startswith("gpu") else "fp32",
+            text_recognition_batch_size=rec_batch_size or (6 if device.startswith("gpu") else 1),
+            text_detection_model_name=PADDLE_DET_MODEL,
+            text_recognition_model_name=PADDLE_REC_MODEL,
         )
+        for option, subdir in (("text_detection_model_dir", "det"), ("text_recognition_model_dir", "rec")):
+            if (PADDLE_MODEL_DIR / subdir).is_dir():
+                options[option] = str(PADDLE_MODEL_DIR / subdir)
+        
+        if PADDLE_ENABLE_HPI:
+            try:
+                self.ocr = PaddleOCR(enable_hpi=True, **options)
+                return
+            except (ImportError, RuntimeError) as e:
+                # HPI plugin not installed / unsupported here: use Paddle Inference
+                logger.warning("PaddleOCR high-performance inference unavailable, using Paddle Inference: %s", e)
+        self.ocr = PaddleOCR(**options)
+    
+    def warmup(self):
+        """
+        Push one blank detector-sized page through the full pipeline.
+        Why: Loads weights and picks kernels before the first real request.
+        """
+        blank = np.full((DET_LIMIT_SIDE_LEN, DET_LIMIT_SIDE_LEN, 3), 255, dtype=np.uint8)
+        self.extract_from_images([blank])
     
     def extract_from_image(self, image: Image.Image) -> dict:
         """
         Extract all data from a single field sheet image.
         Returns structured data with confidence scores.
         """
-        # Convert PIL Image to numpy array for PaddleOCR
-        img_array = np.array(image)
+        return self.extract_from_ndarray(_bgr_array(image))
+    
+    def extract_from_ndarray(self, img: np.ndarray) -> dict:
+        """
+        Extract all data from a single field sheet already decoded to a BGR
+        (H, W, 3) uint8 array, e.g. by OpenCV or a PDF renderer.
+        Why: Zero-copy entry point; the array goes to predict() as is.
+        """
+        return self.extract_from_images([img])[0]
+    
+    def extract_from_bytes(self, data) -> dict:
+        """
+        Extract all data from an encoded (JPEG/PNG/...) field sheet image.
+        Why: Decodes once with cv2.imdecode straight into a BGR array,
+        skipping the PIL object and the np.array copy.
+        """
+        img = decode_image_bytes(data)
+        if img is None:
+            raise ValueError("Could not decode image data")
+        return self.extract_from_ndarray(img)
+    
+    def extract_from_images(self, images: list, batch_size: int = PREDICT_BATCH_SIZE) -> list:
+        """
+        Extract data from several field sheet pages with batched predict() calls.
+        Why: Batching amortizes per-call overhead, and a background thread runs
+        the next batch's inference (native code, GIL released) while this one
+        parses the previous batch. Returns one dict per page, in order.
+        """
+        if not images:
+            return []
+        
+        # Accepts BGR arrays (no copy) or PIL Images (flipped to BGR)
+        img_arrays = [_bgr_array(image) for image in images]
+        batch_size = max(1, batch_size)
+        batches = [img_arrays[i:i + batch_size] for i in range(0, len(img_arrays), batch_size)]
+        
+        if len(batches) == 1:
+            return [self.extract_from_result(res) for res in self._predict(batches[0])]
+        return self._extract_batches(batches, self._predict)
+    
+    def batch_extract(self, images: list, size: Optional[Tuple[int, int]] = None,
+                      batch_size: int = PREDICT_BATCH_SIZE, warmup: bool = True) -> list:
+        """
+        Extract data from same-template pages resized to one (width, height).
+        Why: With every batch the same shape, the kernels cuDNN picks on a
+        warm-up pass are reused for the whole run. `size` defaults to the first
+        page's; polygons are mapped back to each page's own coordinates, so the
+        column calibration still applies. Short runs (< UNIFORM_BATCH_MIN pages)
+        go through extract_from_images() instead.
+        """
+        if len(images) < UNIFORM_BATCH_MIN:
+            return self.extract_from_images(images, batch_size)
+        
+        img_arrays = [_bgr_array(image) for image in images]
+        width, height = size or img_arrays[0].shape[1::-1]
+        pages = []
+        for img in img_arrays:
+            h, w = img.shape[:2]
+            if (w, h) != (width, height):
+                shrink = w * h > width * height
+                img = cv2.resize(img, (width, height),
+                                 interpolation=cv2.INTER_AREA if shrink else cv2.INTER_LINEAR)
+            pages.append((img, (w / width, h / height)))
+        
+        batch_size = max(1, batch_size)
+        shape = (min(batch_size, len(pages)), pages[0][0].shape)
+        if warmup and shape not in self._warmed_shapes:
+            self._predict([np.full_like(pages[0][0], 255)] * shape[0])
+            self._warmed_shapes.add(shape)
+        
+        def predict(batch):
+            results = self._predict([img for img, _ in batch])
+            return [
+                _scale_result(res, scale) if res is not None and scale != (1.0, 1.0) else res
+                for res, (_, scale) in zip(results, batch)
+            ]
+        
+        batches = [pages[i:i + batch_size] for i in range(0, len(pages), batch_size)]
+        return self._extract_batches(batches, predict)
+    
+    def extract_from_page_stream(self, pages: Iterable, batch_size: int = PREDICT_BATCH_SIZE,
+                                 max_wait: float = STREAM_MAX_WAIT) -> list:
+        """
+        Extract data from pages produced lazily, e.g. rendered one by one from a PDF.
+        Why: A render thread fills a bounded queue while predict() runs in a
+        second thread and this one parses, so the three stages overlap. A batch
+        launches once it is full or its oldest page has waited `max_wait` seconds.
+        Exceptions raised by `pages` are re-raised here. Returns one dict per page.
+        """
+        batches = _stream_batches(pages, max(1, batch_size), max_wait)
+        try:
+            return self._extract_batches(batches, self._predict_pages)
+        finally:
+            batches.close()
+    
+    def _extract_batches(self, batches: Iterable, predict: Callable) -> list:
+        """Two-stage pipeline with a one-batch buffer: inference | parsing."""
+        extracted = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr-predict") as pool:
+            pending = None
+            for batch in batches:
+                submitted = pool.submit(predict, batch)
+                if pending is not None:
+                    extracted.extend(self.extract_from_result(res) for res in pending.result())
+                pending = submitted
+            if pending is not None:
+                extracted.extend(self.extract_from_result(res) for res in pending.result())
+        
+        return extracted
+    
+    def _predict_pages(self, img_arrays: list) -> list:
+        """_predict(), fanned out one page per pool thread when the engine allows it."""
+        if self._pool is None or len(img_arrays) < 2:
+            return self._predict(img_arrays)
+        return list(self._pool.map(lambda img: self._predict([img])[0], img_arrays))
+    
+    def _predict(self, img_arrays: list) -> list:
+        """Run PaddleOCR 3.x predict() on a batch; always one result (or None) per input."""
+        if REGION_CROP:
+            return self._predict_regions(img_arrays)
+        return self._run_predict(img_arrays)
+    
+    def _run_predict(self, img_arrays: list) -> list:
+        """
+        Call the engine's predict() on pages shrunk to PREDICT_MAX_SIDE.
+        Returns one result (or None) per input, polygons in input coordinates.
+        """
+        inputs = []
+        scales = []
+        for img in img_arrays:
+            h, w = img.shape[:2]
+            scale = PREDICT_MAX_SIDE / max(h, w, 1) if PREDICT_MAX_SIDE else 1.0
+            if scale < 1.0:
+                img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))),
+                                 interpolation=cv2.INTER_AREA)
+                scales.append((w / img.shape[1], h / img.shape[0]))
+            else:
+                scales.append(None)
+            inputs.append(img)
+        
+        results = list(self.predict_raw(inputs) or [])
+        results += [None] * (len(inputs) - len(results))
+        return [
+            _scale_result(res, scale) if res is not None and scale is not None else res
+            for res, scale in zip(results, scales)
+        ]
+    
+    def predict_raw(self, inputs):
+        """
+        The engine's own predict() output for `inputs`, unparsed.
+        Why: Paddle predictors and the OpenVINO engine's shared infer request
+        aren't safe to call from several threads, so those calls take turns
+        (each already uses all of its OMP threads); ONNX Runtime runs them
+        concurrently.
+        """
+        if self._predict_lock is None:
+            return self.ocr.predict(inputs)
+        with self._predict_lock:
+            return self.ocr.predict(inputs)
+    
+    def _predict_regions(self, img_arrays: list) -> list:
+        """
+        Predict header and table crops of each page in one batch, then stitch
+        each page's pair back into a single page-space result.
+        """
+        table_top = HEADER_SPLIT_Y - REGION_CROP_PAD
+        crops = []
+        split = []
+        for img in img_arrays:
+            # Pages too short to hold a table are OCR'd whole
+            split.append(img.shape[0] > HEADER_SPLIT_Y + REGION_CROP_PAD)
+            if split[-1]:
+                crops.append(img[:HEADER_SPLIT_Y + REGION_CROP_PAD])
+                crops.append(np.ascontiguousarray(img[table_top:, :TABLE_RIGHT_X + REGION_CROP_PAD]))
+            else:
+                crops.append(img)
         
-        # Run OCR using PaddleOCR 3.x predict() method
-        result = self.ocr.predict(img_array)
+        results = self._run_predict(crops)
         
-        if not result or len(result) == 0:
+        merged = []
+        i = 0
+        for is_split in split:
+            if is_split:
+                merged.append(_merge_region_results(results[i], results[i + 1], table_top))
+                i += 2
+            else:
+                merged.append(results[i])
+                i += 1
+        return merged
+    
+    def extract_from_result(self, res) -> dict:
+        """
+        Parse one page's PaddleOCR result into project info and readings.
+        Why: Separates parsing from inference so batched results can be
+        consumed page by page.
+        """
+        if res is None:
             return {"project_info": {}, "readings": [], "raw_text": []}
         
         # Extract all text boxes with positions and confidence
-        # PaddleOCR 3.x returns OCRResult objects with rec_texts, rec_scores, rec_polys
-        text_boxes = []
-        
-        for res in result:
-            # Get recognized texts, scores, and polygons
-            rec_texts = []
-            rec_scores = []
-            rec_polys = []
-            
-            # Try dict access first
-            if isinstance(res, dict):
-                rec_texts = res.get("rec_texts", [])
-                rec_scores = res.get("rec_scores", [])
-                rec_polys = res.get("rec_polys", res.get("rec_boxes", []))
-            
-            # Try attribute access for OCRResult objects
-            if hasattr(res, 'rec_texts') and res.rec_texts:
-                rec_texts = res.rec_texts
-            if hasattr(res, 'rec_scores') and res.rec_scores:
-                rec_scores = res.rec_scores
-            if hasattr(res, 'rec_polys') and res.rec_polys:
-                rec_polys = res.rec_polys
-            elif hasattr(res, 'rec_boxes') and res.rec_boxes:
-                rec_polys = res.rec_boxes
-            
-            # Convert to list if numpy array
-            if hasattr(rec_texts, 'tolist'):
-                rec_texts = rec_texts.tolist()
-            if hasattr(rec_scores, 'tolist'):
-                rec_scores = rec_scores.tolist()
-            
-            # Process each detected text
-            for j in range(len(rec_texts)):
-                text = rec_texts[j] if j < len(rec_texts) else ""
-                score = rec_scores[j] if j < len(rec_scores) else 0
-                poly = rec_polys[j] if j < len(rec_polys) else []
-                
-                # Skip empty text
-                if not text or not str(text).strip():
-                    continue
-                
-                # Calculate center position from polygon
-                center_x, center_y = 0, 0
-                bbox = poly
-                
-                if poly is not None:
-                    try:
-                        # Convert numpy array to list if needed
-                        if hasattr(poly, 'tolist'):
-                            poly = poly.tolist()
-                        
-                        if len(poly) >= 4:
-                            if isinstance(poly[0], (list, tuple)):
-                                # Format: [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                                center_x = sum(p[0] for p in poly) / len(poly)
-                                center_y = sum(p[1] for p in poly) / len(poly)
-                                bbox = poly
-                            else:
-                                # Flat format: [x1,y1,x2,y2,x3,y3,x4,y4]
-                                center_x = (poly[0] + poly[2] + poly[4] + poly[6]) / 4
-                                center_y = (poly[1] + poly[3] + poly[5] + poly[7]) / 4
-                                bbox = [[poly[i], poly[i+1]] for i in range(0, 8, 2)]
-                    except Exception:
-                        pass
-                
-                text_boxes.append({
-                    "text": str(text),
-                    "confidence": float(score) if score else 0.0,
-                    "x": center_x,
-                    "y": center_y,
-                    "bbox": bbox
-                })
+        rec_texts, rec_scores, rec_polys = _result_fields(res)
+        
+        # Box centers for every detected text in one vectorized pass
+        count = len(rec_texts)
+        centers = _box_centers(rec_polys, count)
+        
+        # Normalize texts and scores once, then keep only non-empty boxes
+        all_texts = [str(text) if text else "" for text in rec_texts]
+        scores = _score_array(rec_scores, count)
+        keep = np.array([j for j, text in enumerate(all_texts) if text.strip()], dtype=np.intp)
         
         # Sort by Y position (top to bottom), then X (left to right)
-        text_boxes.sort(key=lambda b: (b["y"], b["x"]))
+        boxes = TextBoxes([all_texts[j] for j in keep], scores[keep], centers[keep, 0], centers[keep, 1])
+        boxes = boxes.take(np.lexsort((boxes.xs, boxes.ys)))
         
-        # Parse header and table data
-        project_info = self._extract_project_info(text_boxes)
-        readings = self._extract_readings(text_boxes)
+        # Boxes are sorted by Y, so the header area (y < 300) is a prefix and
+        # the table area (below header, typically y > 200) is a suffix
+        header_end = int(np.searchsorted(boxes.ys, 300, side="left"))
+        table_start = int(np.searchsorted(boxes.ys, 200, side="right"))
+        
+        # Parse the table first, marking the boxes parsed into reading cells;
+        # the header parser then skips those in the overlap band
+        in_reading = np.zeros(len(boxes.texts), dtype=bool)
+        readings = self._extract_readings(boxes.slice(table_start, len(boxes.texts)), in_reading[table_start:])
+        header = (
+            boxes.take(np.flatnonzero(~in_reading[:header_end]))
+            if in_reading[:header_end].any() else boxes.slice(0, header_end)
+        )
+        project_info = self._extract_project_info(header)
         
         return {
             "project_info": project_info,
             "readings": readings,
-            "raw_text": [{"text": b["text"], "confidence": b["confidence"]} for b in text_boxes]
+            "raw_text": [
+                {"text": text, "confidence": confidence}
+                for text, confidence in zip(boxes.texts, boxes.confs.tolist())
+            ]
         }
     
-    def _extract_project_info(self, text_boxes: list) -> dict:
+    def _extract_project_info(self, header: TextBoxes) -> dict:
         """
-        Extract header/project information from OCR results.
+        Extract header/project information from the header area's text boxes.
         Why: Parses the top section of field sheets containing metadata.
         """
         project_info = {}
         
-        # Common field patterns to look for
-        patterns = {
-            "test_no": [r"TEST\s*NO[:\.\-]?\s*(.+)", r"P\.\s*\d+\s*/\s*\d+"],
-            "project": [r"PROJECT[:\.\-]?\s*(.+)"],
-            "location": [r"LOCATION[:\.\-]?\s*(.+)"],
-            "contractor": [r"CONTRACTOR[:\.\-]?\s*(.+)"],
-            "client_name": [r"CLIENT[S']?\s*NAME[:\.\-]?\s*(.+)"],
-            "pile_diameter": [r"PILE\s*DIAMETER[:\.\-]?\s*(.+)", r"(\d+)\s*mm"],
-            "design_load": [r"DESIGN\s*LOAD[:\.\-]?\s*(.+)", r"(\d+)\s*MT"],
-            "test_load": [r"TEST\s*LOAD[:\.\-]?\s*(.+)"],
-            "ram_area": [r"RAM\s*AREA[:\.\-]?\s*(.+)", r"(\d+)\s*cm"],
-            "date_of_casting": [r"DATE\s*OF\s*CASTING[:\.\-]?\s*(.+)"],
-            "pile_depth": [r"PILE\s*DEPTH[:\.\-]?\s*(.+)"],
-            "lc_dial_gauge": [r"L\.?C\.?\s*OF\s*DIAL\s*GAUGE[:\.\-]?\s*(.+)"],
-            "test_type": [r"TYPE\s*OF\s*TEST[:\.\-]?\s*(.+)", r"(RVPLT|IVPLT|PULLOUT|LATERAL)"],
-            "mixed_design": [r"MIXED\s*DESIGN[:\.\-]?\s*(.+)", r"(M\s*-?\s*\d+)"],
-        }
+        header_confs = header.confs.tolist()
+        all_header_text = " ".join(header.texts)
+        # Offset just past each box's text + separator in all_header_text,
+        # so a match position maps straight back to the box it came from
+        box_ends = list(accumulate(len(text) + 1 for text in header.texts))
         
-        # Only search in top portion of document (header area)
-        header_boxes = [b for b in text_boxes if b["y"] < 300]
-        all_header_text = " ".join([b["text"] for b in header_boxes])
-        
-        for field, field_patterns in patterns.items():
-            for pattern in field_patterns:
-                match = re.search(pattern, all_header_text, re.IGNORECASE)
-                if match:
-                    value = match.group(1) if match.lastindex else match.group(0)
-                    # Find the confidence of the matching text box
-                    confidence = 0.8  # Default
-                    for box in header_boxes:
-                        if value.lower() in box["text"].lower():
-                            confidence = box["confidence"]
-                            break
-                    project_info[field] = {"value": value.strip(), "confidence": confidence}
-                    break
-            
-            # Set default if not found
-            if field not in project_info:
+        # Match on the lowercased text when lowering keeps every offset in place
+        # (a few characters like "İ" lower to two); values come from the original
+        header_lower = all_header_text.lower()
+        use_lower = len(header_lower) == len(all_header_text)
+        
+        for field, (lower_regex, regex, groups) in _HEADER_PATTERNS.items():
+            match = lower_regex.match(header_lower) if use_lower else regex.match(all_header_text)
+            if match:
+                # Value group of the one alternative that participated
+                group = next(value for outer, value in groups if match.start(outer) >= 0)
+                value = all_header_text[match.start(group):match.end(group)]
+                # Confidence of the text box the value starts in
+                box_index = bisect.bisect_right(box_ends, match.start(group))
+                confidence = header_confs[box_index] if box_index < len(header_confs) else 0.8
+                project_info[field] = {"value": value.strip(), "confidence": confidence}
+            else:
+                # Set default if not found
                 project_info[field] = {"value": None, "confidence": 0.0}
         
         return project_info
     
-    def _extract_readings(self, text_boxes: list) -> list:
+    def _extract_readings(self, table: TextBoxes, in_reading: Optional[np.ndarray] = None) -> list:
         """
-        Extract tabular readings from the field sheet.
+        Extract tabular readings from the table area's text boxes.
         Why: Parses the main data table with time, pressure, and gauge readings.
+        `in_reading`, if given, is a bool array over the table's boxes that is
+        set True for each box parsed into a cell of a returned reading.
         """
         readings = []
         
-        # Find table area (below header, typically y > 200)
-        table_boxes = [b for b in text_boxes if b["y"] > 200]
-        
-        if not table_boxes:
+        if not table.texts:
             return readings
         
         # Group boxes by row (similar Y coordinate, within threshold)
-        rows = self._group_into_rows(table_boxes, y_threshold=25)
+        rows = self._group_into_rows(table, y_threshold=25)
+        columns = classify_columns(table.xs, _COLUMN_EDGES)
         
-        # Process each row - keep track of Y position for ordering
-        for row in rows:
-            reading = self._parse_reading_row(row)
-            if reading:
-                # Store the row's Y position for document-order sorting
-                avg_y = sum(box["y"] for box in row) / len(row)
-                reading["_row_y"] = avg_y
-                readings.append(reading)
+        # Parse every numeric cell up front and range-check them in one pass;
+        # NaN (not a number, or not a numeric column) fails both comparisons
+        col_max = _COLUMN_MAX[columns]
+        values = _numeric_values(table.texts, np.flatnonzero(~np.isnan(col_max)))
+        in_range = (values >= 0) & (values <= col_max)
         
-        # Sort by document position (Y coordinate) instead of time
+        # Rows come out top to bottom, so readings stay in document order
         # Why: OCR may misread digits (7→2), so time-based sorting is unreliable.
         # Document order preserves the chronological sequence from the field sheet.
-        readings.sort(key=lambda r: r.get("_row_y", 0))
-        
-        # Remove the internal Y position field
-        for reading in readings:
-            reading.pop("_row_y", None)
+        for row in rows:
+            reading = self._parse_reading_row(table, row, columns, values, in_range, in_reading)
+            if reading:
+                readings.append(reading)
         
         return readings
     
-    def _group_into_rows(self, boxes: list, y_threshold: float = 25) -> list:
+    def _group_into_rows(self, boxes: TextBoxes, y_threshold: float = 25) -> list:
         """
         Group text boxes into rows based on Y position.
         Why: Table cells in the same row have similar Y coordinates.
+        Returns one int32 array of box indices per row, ordered left to right.
         """
-        if not boxes:
-            return []
-        
-        rows = []
-        current_row = [boxes[0]]
-        current_y = boxes[0]["y"]
-        
-        for box in boxes[1:]:
-            if abs(box["y"] - current_y) <= y_threshold:
-                current_row.append(box)
-            else:
-                rows.append(sorted(current_row, key=lambda b: b["x"]))
-                current_row = [box]
-                current_y = box["y"]
-        
-        if current_row:
-            rows.append(sorted(current_row, key=lambda b: b["x"]))
+        # Boxes arrive sorted by Y, so each row is the run of boxes within
+        # y_threshold of the row's first box
+        row_ids = group_rows(boxes.ys, float(y_threshold))
+        bounds = np.flatnonzero(np.diff(row_ids)) + 1
         
-        return rows
+        # One stable sort by (row, X) orders every row left to right at once;
+        # equal-X boxes keep their Y order
+        order = np.lexsort((boxes.xs, row_ids)).astype(np.int32)
+        return np.split(order, bounds)
     
-    def _parse_reading_row(self, row: list) -> Optional[dict]:
+    def _parse_reading_row(self, boxes: TextBoxes, row: np.ndarray, columns: np.ndarray,
+                           values: np.ndarray, in_range: np.ndarray,
+                           in_reading: Optional[np.ndarray] = None) -> Optional[dict]:
         """
         Parse a single row of readings using X position for column mapping.
         Why: Extracts time, pressure, and gauge values based on their horizontal position
         in the table, which is more reliable than content-based detection.
+        `columns` holds each box's index into _COLUMN_NAMES (-1 outside the table);
+        `values` / `in_range` are each box's parsed number and whether it is
+        plausible for its column. When the row yields a reading, the boxes
+        behind its cells are marked in `in_reading` (if given); other boxes in
+        the row, such as header text right of the table or a header label
+        read as a number, stay unmarked.
         """
         if len(row) < 4:
             return None
         
-        reading = {
-            "date": {"value": None, "confidence": 0.0},
-            "time": {"value": None, "confidence": 0.0},
-            "pressure": {"value": None, "confidence": 0.0},
-            "gauge1": {"value": None, "confidence": 0.0},
-            "gauge2": {"value": None, "confidence": 0.0},
-            "gauge3": {"value": None, "confidence": 0.0},
-            "gauge4": {"value": None, "confidence": 0.0},
-            "remark": {"value": None, "confidence": 1.0},
-        }
-        
-        # Column X position ranges (calibrated from actual field sheets)
-        # For ~2000px width images with standard ZedGeo layout:
-        column_ranges = {
-            "date": (0, 130),          # DATE column (x < 130)
-            "time": (130, 220),        # TIME column (x ~ 162)
-            "pressure": (220, 350),    # PRESSURE gauge reading kg/cm² (x ~ 266)
-            "load": (350, 500),        # LOAD IN MT (x ~ 405) - skip this
-            "gauge1": (500, 640),      # Reading 1 - Test Pile (x ~ 535)
-            "gauge2": (640, 780),      # Reading 2 - Test Pile (x ~ 681)
-            "gauge3": (780, 920),      # Reading 3 - Reaction Pile (x ~ 811)
-            "gauge4": (920, 1060),     # Reading 4 - Reaction Pile (x ~ 943)
-        }
+        # Parsed cells as field -> (value, confidence), and the box behind each;
+        # the output dict is only built for rows that pass validation
+        cells = {}
+        cell_boxes = {}
         
-        # Time pattern - handles various formats from OCR
-        time_pattern = r"^\d{1,2}[:\.\-!\·]\d{2}$"
-        
-        for box in row:
-            text = box["text"].strip()
-            confidence = box["confidence"]
-            x = box["x"]
-            
-            # Clean up common OCR errors in text
-            clean_text = text.replace("·", ".").replace("!", ":").replace("-", ".").replace("r", ".")
-            clean_text = re.sub(r"[A-Za-z]", "", clean_text)  # Remove stray letters
-            clean_text = clean_text.strip()
-            
-            # Determine column based on X position
-            column = None
-            for col_name, (x_min, x_max) in column_ranges.items():
-                if x_min <= x < x_max:
-                    column = col_name
-                    break
+        for i in row:
+            # Column from X position, classified for the whole table up front
+            idx = columns[i]
+            column = _COLUMN_NAMES[idx] if idx >= 0 else None
+            if column is None or column == "load":
+                # Load in MT - skip, we use pressure for calculations
+                continue
             
             if column == "date":
                 # Check for date format (DD/MM or DDMMYY)
-                if re.match(r"^\d{2,6}[/]?\d{0,4}$", text):
-                    reading["date"] = {"value": text, "confidence": confidence}
+                text = boxes.texts[i].strip()
+                if _DATE_RE.fullmatch(text):
+                    cells["date"] = (text, float(boxes.confs[i]))
+                    cell_boxes["date"] = i
             
             elif column == "time":
                 # Parse time - handle various OCR formats
-                if re.match(time_pattern, text):
+                text = boxes.texts[i].strip()
+                if len(text) <= 5 and _TIME_RE.fullmatch(text):
                     # Normalize time format
-                    time_str = re.sub(r"[:\.\-!\·]", ":", text)
-                    reading["time"] = {"value": time_str, "confidence": confidence}
-            
-            elif column == "pressure":
-                # Pressure gauge reading in kg/cm²
-                try:
-                    value = float(clean_text)
-                    if 0 <= value <= 300:  # Reasonable pressure range
-                        reading["pressure"] = {"value": value, "confidence": confidence}
-                except (ValueError, TypeError):
-                    pass
-            
-            elif column == "load":
-                # Load in MT - skip, we use pressure for calculations
-                pass
+                    cells["time"] = (_TIME_SEP_RE.sub(":", text), float(boxes.confs[i]))
+                    cell_boxes["time"] = i
             
-            elif column in ["gauge1", "gauge2", "gauge3", "gauge4"]:
-                # Dial gauge readings (typically 0-20mm range)
-                try:
-                    value = float(clean_text)
-                    if 0 <= value <= 50:  # Reasonable gauge reading range
-                        reading[column] = {"value": value, "confidence": confidence}
-                except (ValueError, TypeError):
-                    pass
-        
-        # Validate: need at least time and some data
-        has_time = reading["time"]["value"] is not None
-        has_gauges = any(reading[f"gauge{i}"]["value"] is not None for i in range(1, 5))
-        has_pressure = reading["pressure"]["value"] is not None
-        
-        if has_time and (has_gauges or has_pressure):
-            return reading
+            elif in_range[i]:
+                # Pressure and dial gauge readings, already parsed and range-checked
+                cells[column] = (float(values[i]), float(boxes.confs[i]))
+                if _WORD_RE.search(boxes.texts[i]):
+                    cell_boxes.pop(column, None)
+                else:
+                    cell_boxes[column] = i
         
-        return None
+        # Validate: need at least time and some data (any cell besides date
+        # and time is a pressure or gauge reading)
+        has_data = len(cells) > 1 + ("date" in cells)
+        if "time" not in cells or not has_data:
+            return None
+        
+        if in_reading is not None:
+            in_reading[list(cell_boxes.values())] = True
+        
+        # Parsed cells override the defaults in place, so field order is kept
+        return {
+            field: {"value": value, "confidence": confidence}
+            for field, (value, confidence) in {**_EMPTY_READING, **cells}.items()
+        }
+
+
+def _stream_batches(pages: Iterable, batch_size: int, max_wait: float) -> Iterator[list]:
+    """
+    Yield lists of up to `batch_size` pages pulled from `pages` by a producer thread.
+    Why: The producer keeps rendering while earlier batches are in predict();
+    the queue bound caps how far it runs ahead. Closing the generator stops
+    the producer and closes `pages`, releasing whatever buffers it holds.
+    """
+    buffer = queue.Queue(maxsize=2 * batch_size)
+    stop = threading.Event()
     
-    def _sort_readings_by_time(self, readings: list) -> list:
-        """
-        Sort readings by time, handling multi-page documents.
-        Why: Ensures chronological order when combining readings from multiple pages.
-        """
-        def time_to_minutes(time_str: str) -> int:
-            if not time_str:
-                return 0
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+    
+    def produce():
+        try:
+            for page in pages:
+                if not put(np.asarray(page)):
+                    return
+            put(_STREAM_END)
+        except Exception as e:
+            put(e)
+        finally:
+            close = getattr(pages, "close", None)
+            if close is not None:
+                close()
+    
+    producer = threading.Thread(target=produce, name="ocr-render", daemon=True)
+    producer.start()
+    try:
+        batch = []
+        deadline = 0.0
+        while True:
+            try:
+                timeout = max(0.0, deadline - time.monotonic()) if batch else None
+                item = buffer.get(timeout=timeout)
+            except queue.Empty:
+                # Oldest page waited long enough: flush a partial batch
+                yield batch
+                batch = []
+                continue
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if not batch:
+                deadline = time.monotonic() + max_wait
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        stop.set()
+        producer.join()
+
+
+def _numeric_values(texts: list, indices: np.ndarray) -> np.ndarray:
+    """
+    Numbers read from texts[i] for each i in `indices`; NaN elsewhere or when
+    the cleaned text isn't a number.
+    """
+    values = np.full(len(texts), np.nan)
+    for i in indices.tolist():
+        # Clean up common OCR errors in text (one translate pass)
+        try:
+            values[i] = float(texts[i].strip().translate(_CLEAN_TRANS).strip())
+        except ValueError:
+            pass
+    return values
+
+
+def _get(res, name: str, default=()):
+    """
+    Read one field from a predict() result, as an attribute or a dict key.
+    Why: OCRResult objects and plain dicts both reach the parser; a missing
+    or None field falls back to `default` without truth-testing arrays.
+    PaddleOCR 3.x's OCRResult is itself a dict, so the key lookup comes first
+    and the (exception-raising) attribute miss only runs for other objects.
+    """
+    value = res.get(name) if isinstance(res, dict) else None
+    if value is None:
+        value = getattr(res, name, None)
+    return default if value is None else value
+
+
+def _result_fields(res) -> tuple:
+    """
+    Pull (rec_texts, rec_scores, rec_polys) out of one predict() result.
+    PaddleOCR 3.x returns OCRResult objects with rec_texts, rec_scores, rec_polys.
+    """
+    rec_polys = _get(res, "rec_polys", None)
+    if rec_polys is None:
+        rec_polys = _get(res, "rec_boxes", [])
+    return _get(res, "rec_texts", []), _get(res, "rec_scores", []), rec_polys
+
+
+def _merge_region_results(header_res, table_res, table_top: int) -> dict:
+    """
+    Combine a page's header-crop and table-crop results in page coordinates.
+    Why: The crops overlap around HEADER_SPLIT_Y; keeping header-crop boxes
+    above the split and table-crop boxes below it counts each box once.
+    """
+    texts, scores, polys = [], [], []
+    for res, y_offset, below_split in ((header_res, 0, False), (table_res, table_top, True)):
+        if res is None:
+            continue
+        rec_texts, rec_scores, rec_polys = _result_fields(res)
+        count = len(rec_texts)
+        centers_y = _box_centers(rec_polys, count)[:, 1] + y_offset
+        keep = np.flatnonzero((centers_y >= HEADER_SPLIT_Y) == below_split)
+        texts.extend(rec_texts[j] for j in keep)
+        scores.append(_score_array(rec_scores, count)[keep])
+        polys.extend(
+            np.asarray(rec_polys[j] if j < len(rec_polys) else [], dtype=np.float64).reshape(-1, 2) + (0, y_offset)
+            for j in keep
+        )
+    scores = np.concatenate(scores) if scores else np.zeros(0)
+    return {"rec_texts": texts, "rec_scores": scores, "rec_polys": polys}
+
+
+def _scale_result(res, scale: tuple) -> dict:
+    """Map one predict() result's polygons back up by (x, y) `scale`."""
+    rec_texts, rec_scores, rec_polys = _result_fields(res)
+    factors = np.array(scale, dtype=np.float64)
+    try:
+        polys = np.asarray(rec_polys, dtype=np.float64)
+        polys = (polys.reshape(-1, 2) * factors).reshape(polys.shape)
+    except (ValueError, TypeError):
+        # Ragged or missing polygons: scale the usable ones one by one
+        polys = []
+        for poly in rec_polys:
             try:
-                parts = time_str.replace(".", ":").split(":")
-                hours = int(parts[0])
-                minutes = int(parts[1]) if len(parts) > 1 else 0
-                return hours * 60 + minutes
-            except (ValueError, IndexError):
-                return 0
+                points = np.asarray(poly, dtype=np.float64)
+                poly = (points.reshape(-1, 2) * factors).reshape(points.shape)
+            except (ValueError, TypeError):
+                pass
+            polys.append(poly)
+    return {"rec_texts": rec_texts, "rec_scores": rec_scores, "rec_polys": polys}
+
+
+def decode_image_bytes(data) -> Optional[np.ndarray]:
+    """
+    Decode an encoded image (bytes or any buffer) to a BGR uint8 array, or None.
+    Why: One libjpeg-turbo/libpng pass with no intermediate PIL image.
+    """
+    # Ignore EXIF orientation, as PIL does, so column positions stay put
+    return cv2.imdecode(
+        np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+    )
+
+
+def _bgr_array(image) -> np.ndarray:
+    """
+    A page as the BGR array PaddleOCR expects: arrays pass through as is,
+    PIL Images are converted to RGB (if needed) and channel-flipped.
+    """
+    if not isinstance(image, Image.Image):
+        return np.asarray(image)
+    # convert() always copies, even to the mode the image already has
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    # The reversed-channel view is not a copy
+    return np.asarray(image)[:, :, ::-1]
+
+
+def _score_array(rec_scores, count: int) -> np.ndarray:
+    """
+    Recognition scores as a float array of length `count`, 0.0 where missing.
+    Why: One NumPy conversion replaces a float() call per box. None entries
+    come through as NaN and are zeroed like a missing score.
+    """
+    scores = np.zeros(count)
+    n = min(count, len(rec_scores))
+    try:
+        scores[:n] = np.asarray(rec_scores[:n], dtype=np.float64)
+    except (TypeError, ValueError):
+        scores[:n] = [float(score) if score else 0.0 for score in rec_scores[:n]]
+    return np.nan_to_num(scores, nan=0.0, copy=False)
+
+
+def _box_centers(rec_polys, count: int) -> np.ndarray:
+    """
+    Centers of the first `count` text polygons as a (count, 2) array.
+    Why: One NumPy mean over all boxes replaces a Python sum per box. Accepts
+    [[x, y] * 4] or flat [x1, y1, ..., x4, y4] polygons; missing or
+    malformed ones get (0, 0).
+    """
+    centers = np.zeros((count, 2))
+    m = min(count, len(rec_polys))
+    if m == 0:
+        return centers
+    
+    try:
+        polys = np.asarray(rec_polys[:m], dtype=np.float64)
+    except (ValueError, TypeError):
+        polys = None  # ragged or mixed polygons
+    
+    if polys is not None and polys.ndim == 3 and polys.shape[1] >= 4 and polys.shape[2] == 2:
+        centers[:m] = polys.mean(axis=1)
+    elif polys is not None and polys.ndim == 2 and polys.shape[1] >= 8:
+        centers[:m] = polys[:, :8].reshape(m, 4, 2).mean(axis=1)
+    else:
+        for j in range(m):
+            centers[j] = _poly_center(rec_polys[j])
+    return centers
+
+
+def _poly_center(poly) -> tuple:
+    """Center of one polygon in either format, or (0, 0) if it can't be read."""
+    if poly is None:
+        return 0, 0
+    try:
+        # Convert numpy array to list if needed
+        if hasattr(poly, 'tolist'):
+            poly = poly.tolist()
         
-        return sorted(readings, key=lambda r: time_to_minutes(r["time"]["value"]))
+        if len(poly) >= 4:
+            if isinstance(poly[0], (list, tuple)):
+                # Format: [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
+                return sum(p[0] for p in poly) / len(poly), sum(p[1] for p in poly) / len(poly)
+            # Flat format: [x1,y1,x2,y2,x3,y3,x4,y4]
+            return (poly[0] + poly[2] + poly[4] + poly[6]) / 4, (poly[1] + poly[3] + poly[5] + poly[7]) / 4
+    except Exception:
+        pass
+    return 0, 0
+
+
+def _paddle_device() -> str:
+    """Run on the first GPU when Paddle was built with CUDA and one is visible."""
+    import paddle
+    
+    if paddle.device.is_compiled_with_cuda() and paddle.device.cuda.device_count() > 0:
+        return "gpu:0"
+    return "cpu"
+
 
+# Instances for reuse, one per constructor configuration, and the keys of
+# those this process has warmed up. The lock makes creation race-safe when
+# several threads ask for the same configuration at once.
+_ocr_instances = {}
+_warmed_ocr = set()
+_ocr_lock = threading.Lock()
+
+def get_ocr(**options) -> PileSheetOCR:
+    """
+    Get or create the OCR processor for these PileSheetOCR options (the
+    defaults when none are given), warmed up before first use.
+    """
+    key = tuple(sorted(options.items()))
+    with _ocr_lock:
+        ocr = _ocr_instances.get(key)
+        if ocr is None:
+            ocr = _ocr_instances[key] = PileSheetOCR(**options)
+        if key not in _warmed_ocr:
+            ocr.warmup()
+            _warmed_ocr.add(key)
+        return ocr
 
-# Singleton instance for reuse
-_ocr_instance = None
 
-def get_ocr() -> PileSheetOCR:
-    """Get or create the OCR processor singleton."""
-    global _ocr_instance
-    if _ocr_instance is None:
-        _ocr_instance = PileSheetOCR()
-    return _ocr_instance
+def preload(**options) -> Optional[PileSheetOCR]:
+    """
+    Load the Paddle CPU model without running it, in a server master process
+    before it forks its workers (see gunicorn.conf.py).
+    Why: Forked workers inherit the loaded weights copy-on-write instead of each
+    loading its own copy; their get_ocr() then reuses the inherited instance.
+    Inference thread pools, ORT/OpenVINO sessions and CUDA contexts don't
+    survive fork, so nothing runs here: warm-up happens in each worker, and
+    other backends, GPU devices and HPI (which builds ORT/OpenVINO sessions
+    inside Paddle) load per worker as before (returns None).
+    """
+    if options.get("backend", OCR_BACKEND) != "paddle" or PADDLE_ENABLE_HPI or _paddle_device() != "cpu":
+        return None
+    key = tuple(sorted(options.items()))
+    with _ocr_lock:
+        if key not in _ocr_instances:
+            _ocr_instances[key] = PileSheetOCR(**options)
+        return _ocr_instances[key]
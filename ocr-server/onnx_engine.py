@@ -0,0 +1,278 @@
+"""
+ONNX Runtime / OpenVINO inference engine for PP-OCR text detection and recognition.
+Why: Lets the OCR server run INT8-quantized PP-OCR det/rec models on CPU,
+which roughly halves inference latency versus the FP32 Paddle runtime.
+The engine mirrors PaddleOCR 3.x's predict() output (rec_texts, rec_scores,
+rec_polys), so PileSheetOCR's parsing code works unchanged on top of it.
+"""
+
+import math
+import os
+from pathlib import Path
+from typing import Callable, List, Tuple, Union
+
+import cv2
+import numpy as np
+
+# File names written by quantize_models.py into the model directory
+DET_MODEL_FILE = "det.onnx"
+REC_MODEL_FILE = "rec.onnx"
+REC_DICT_FILE = "rec_dict.txt"
+
+# Intra-op threads per model (0 = runtime default of one per core).
+# main.py derives OMP_NUM_THREADS from the uvicorn worker count.
+INFERENCE_THREADS = int(os.environ.get("OMP_NUM_THREADS", 0))
+
+# OpenVINO compiled-kernel cache; reusing it cuts model compile time at startup
+OPENVINO_CACHE_DIR = os.environ.get("PILE_OCR_OV_CACHE_DIR", "/tmp/ov_cache")
+
+# Detection preprocessing (PP-OCR DetResizeForTest + NormalizeImage)
+DET_LIMIT_SIDE_LEN = 960
+DET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+DET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+# DB post-processing thresholds (PP-OCR defaults)
+DB_THRESH = 0.3
+DB_BOX_THRESH = 0.6
+DB_UNCLIP_RATIO = 1.5
+DB_MAX_CANDIDATES = 1000
+DB_MIN_SIZE = 3
+
+# Recognition input geometry (PP-OCRv5 rec: 3 x 48 x 320, dynamic width)
+REC_IMG_H = 48
+REC_IMG_W = 320
+REC_BATCH_SIZE = 6
+
+
+def preprocess_det(img: np.ndarray, limit_side_len: int = DET_LIMIT_SIDE_LEN):
+    """
+    Resize and normalize an HWC uint8 image into a 1x3xHxW detector tensor.
+    Why: The DB detector needs both sides to be multiples of 32; returns the
+    per-axis ratios so boxes can be mapped back to the source image.
+    """
+    h, w = img.shape[:2]
+    ratio = min(1.0, limit_side_len / max(h, w))
+    resize_h = max(32, int(round(h * ratio / 32)) * 32)
+    resize_w = max(32, int(round(w * ratio / 32)) * 32)
+    resized = cv2.resize(img, (resize_w, resize_h))
+
+    tensor = (resized.astype(np.float32) / 255.0 - DET_MEAN) / DET_STD
+    tensor = tensor.transpose(2, 0, 1)[np.newaxis]
+    return np.ascontiguousarray(tensor), (resize_h / h, resize_w / w)
+
+
+def preprocess_rec(crops: List[np.ndarray]) -> np.ndarray:
+    """
+    Resize, normalize and right-pad text-line crops into one NCHW batch.
+    Why: Crops in a batch share the widest aspect ratio so the recognizer
+    sees a single tensor.
+    """
+    max_wh_ratio = max([REC_IMG_W / REC_IMG_H] + [c.shape[1] / c.shape[0] for c in crops])
+    batch_w = int(REC_IMG_H * max_wh_ratio)
+    batch = np.zeros((len(crops), 3, REC_IMG_H, batch_w), dtype=np.float32)
+
+    for i, crop in enumerate(crops):
+        h, w = crop.shape[:2]
+        resized_w = min(batch_w, int(math.ceil(REC_IMG_H * w / h)))
+        resized = cv2.resize(crop, (resized_w, REC_IMG_H)).astype(np.float32)
+        batch[i, :, :, :resized_w] = (resized.transpose(2, 0, 1) / 255.0 - 0.5) / 0.5
+
+    return batch
+
+
+def crop_text_line(img: np.ndarray, box: np.ndarray) -> np.ndarray:
+    """
+    Perspective-crop a (possibly rotated) quadrilateral into an upright line.
+    Why: Same rotate-crop step PP-OCR uses between detection and recognition.
+    """
+    box = box.astype(np.float32)
+    crop_w = int(max(np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[2] - box[3])))
+    crop_h = int(max(np.linalg.norm(box[0] - box[3]), np.linalg.norm(box[1] - box[2])))
+    crop_w, crop_h = max(crop_w, 1), max(crop_h, 1)
+
+    target = np.array([[0, 0], [crop_w, 0], [crop_w, crop_h], [0, crop_h]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(box, target)
+    crop = cv2.warpPerspective(
+        img, matrix, (crop_w, crop_h),
+        borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC
+    )
+
+    # Tall crops are vertical text lines; rotate them upright
+    if crop_h / crop_w >= 1.5:
+        crop = np.rot90(crop)
+    return crop
+
+
+def _order_points(box: np.ndarray) -> np.ndarray:
+    """Order 4 points as top-left, top-right, bottom-right, bottom-left."""
+    by_x = box[np.argsort(box[:, 0])]
+    left = by_x[:2][np.argsort(by_x[:2, 1])]
+    right = by_x[2:][np.argsort(by_x[2:, 1])]
+    return np.array([left[0], right[0], right[1], left[1]], dtype=np.float32)
+
+
+def _box_score(pred: np.ndarray, box: np.ndarray) -> float:
+    """Mean probability inside the box polygon (DB 'fast' box score)."""
+    h, w = pred.shape
+    xmin = int(np.clip(np.floor(box[:, 0].min()), 0, w - 1))
+    xmax = int(np.clip(np.ceil(box[:, 0].max()), 0, w - 1))
+    ymin = int(np.clip(np.floor(box[:, 1].min()), 0, h - 1))
+    ymax = int(np.clip(np.ceil(box[:, 1].max()), 0, h - 1))
+
+    mask = np.zeros((ymax - ymin + 1, xmax - xmin + 1), dtype=np.uint8)
+    shifted = box - np.array([xmin, ymin], dtype=np.float32)
+    cv2.fillPoly(mask, [shifted.astype(np.int32)], 1)
+    return cv2.mean(pred[ymin:ymax + 1, xmin:xmax + 1], mask)[0]
+
+
+def db_postprocess(pred: np.ndarray, ratios: tuple, src_shape: tuple) -> List[np.ndarray]:
+    """
+    Turn a DB probability map into quadrilaterals in source-image pixels.
+    Why: Replaces PaddleOCR's DBPostProcess; the unclip step expands each
+    min-area rectangle by area * ratio / perimeter, which is exact for the
+    rectangular boxes minAreaRect produces.
+    """
+    bitmap = (pred > DB_THRESH).astype(np.uint8) * 255
+    contours, _ = cv2.findContours(bitmap, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+    ratio_h, ratio_w = ratios
+    src_h, src_w = src_shape
+    boxes = []
+
+    for contour in contours[:DB_MAX_CANDIDATES]:
+        (cx, cy), (rw, rh), angle = cv2.minAreaRect(contour)
+        if min(rw, rh) < DB_MIN_SIZE:
+            continue
+        if _box_score(pred, cv2.boxPoints(((cx, cy), (rw, rh), angle))) < DB_BOX_THRESH:
+            continue
+
+        distance = rw * rh * DB_UNCLIP_RATIO / (2 * (rw + rh))
+        rw, rh = rw + 2 * distance, rh + 2 * distance
+        if min(rw, rh) < DB_MIN_SIZE + 2:
+            continue
+
+        box = _order_points(cv2.boxPoints(((cx, cy), (rw, rh), angle)))
+        box[:, 0] = np.clip(box[:, 0] / ratio_w, 0, src_w - 1)
+        box[:, 1] = np.clip(box[:, 1] / ratio_h, 0, src_h - 1)
+        boxes.append(box)
+
+    return boxes
+
+
+def load_onnxruntime(model_path: Path) -> Tuple[Callable, str]:
+    """
+    Build an ONNX Runtime CPU session; returns (run(tensor) -> output, input name).
+    Why: ORT_ENABLE_ALL turns on the full set of graph fusions.
+    """
+    import onnxruntime as ort
+
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    sess_options.intra_op_num_threads = INFERENCE_THREADS
+    sess_options.inter_op_num_threads = 1
+    session = ort.InferenceSession(
+        str(model_path), sess_options, providers=["CPUExecutionProvider"]
+    )
+    input_name = session.get_inputs()[0].name
+    return (lambda tensor: session.run(None, {input_name: tensor})[0]), input_name
+
+
+def load_openvino(model_path: Path) -> Tuple[Callable, str]:
+    """
+    Compile a model for OpenVINO on CPU; returns (run(tensor) -> output, input name).
+    Why: OpenVINO fuses Conv+BN+activation and uses oneDNN VNNI INT8 kernels.
+    The LATENCY hint favors single-request speed, and CACHE_DIR keeps
+    compiled kernels across restarts. An OpenVINO IR (.xml) next to the
+    ONNX file is preferred when present.
+    """
+    import openvino as ov
+
+    ir_path = model_path.with_suffix(".xml")
+    core = ov.Core()
+    core.set_property({"CACHE_DIR": OPENVINO_CACHE_DIR})
+    config = {"PERFORMANCE_HINT": "LATENCY"}
+    if INFERENCE_THREADS:
+        config["INFERENCE_NUM_THREADS"] = INFERENCE_THREADS
+    compiled = core.compile_model(str(ir_path if ir_path.exists() else model_path), "CPU", config)
+    return (lambda tensor: compiled(tensor)[0]), compiled.input(0).any_name
+
+
+# Inference runtimes the engine can run the exported models on
+RUNTIMES = {
+    "onnxruntime": load_onnxruntime,
+    "openvino": load_openvino,
+}
+
+
+class OnnxOCREngine:
+    """
+    PP-OCR detection + recognition running on ONNX Runtime or OpenVINO.
+    Why: Drop-in replacement for the PaddleOCR object held by PileSheetOCR;
+    only predict() is used by the rest of the server. DB post-processing and
+    CTC decoding stay in Python/OpenCV regardless of runtime.
+    """
+
+    def __init__(self, model_dir: Union[str, Path], runtime: str = "onnxruntime"):
+        model_dir = Path(model_dir)
+        load = RUNTIMES[runtime]
+        self._run_det, self.det_input = load(model_dir / DET_MODEL_FILE)
+        self._run_rec, self.rec_input = load(model_dir / REC_MODEL_FILE)
+
+        # CTC label list: index 0 is the blank, then the dictionary, then space
+        dict_text = (model_dir / REC_DICT_FILE).read_text(encoding="utf-8")
+        self.characters = ["blank"] + dict_text.splitlines() + [" "]
+
+    def predict(self, images: Union[np.ndarray, List[np.ndarray]]) -> List[dict]:
+        """
+        Detect and recognize text in one image or a list of images.
+        Returns one dict per image with rec_texts, rec_scores and rec_polys.
+        """
+        if isinstance(images, np.ndarray):
+            images = [images]
+        return [self._predict_one(img) for img in images]
+
+    def detect(self, img: np.ndarray) -> List[np.ndarray]:
+        """Run the DB detector; returns text-line quadrilaterals."""
+        tensor, ratios = preprocess_det(img)
+        pred = self._run_det(tensor)[0, 0]
+        return db_postprocess(pred, ratios, img.shape[:2])
+
+    def recognize(self, crops: List[np.ndarray]) -> List[tuple]:
+        """Run the CTC recognizer; returns (text, score) per crop."""
+        results = [("", 0.0)] * len(crops)
+        # Batch crops of similar aspect ratio to minimize padding
+        order = np.argsort([c.shape[1] / c.shape[0] for c in crops])
+
+        for start in range(0, len(order), REC_BATCH_SIZE):
+            batch_idx = order[start:start + REC_BATCH_SIZE]
+            batch = preprocess_rec([crops[i] for i in batch_idx])
+            probs = self._run_rec(batch)
+            for i, seq in zip(batch_idx, probs):
+                results[i] = self._ctc_decode(seq)
+
+        return results
+
+    def _predict_one(self, img: np.ndarray) -> dict:
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+
+        boxes = self.detect(img)
+        recognized = self.recognize([crop_text_line(img, box) for box in boxes]) if boxes else []
+
+        return {
+            "rec_texts": [text for text, _ in recognized],
+            "rec_scores": [score for _, score in recognized],
+            "rec_polys": boxes,
+        }
+
+    def _ctc_decode(self, seq: np.ndarray) -> tuple:
+        """Greedy CTC decode: collapse repeats, drop blanks, average the kept probs."""
+        indices = seq.argmax(axis=1)
+        probs = seq.max(axis=1)
+        keep = indices != 0
+        keep[1:] &= indices[1:] != indices[:-1]
+
+        if not keep.any():
+            return "", 0.0
+
+        text = "".join(self.characters[i] for i in indices[keep] if i < len(self.characters))
+        return text, float(probs[keep].mean())
@@ -5,6 +5,8 @@
 # The Validator: It contains the logic to mathematically verify the Pressure vs. Load relationship and fix common OCR errors programmatically.\
 
 import json
+import re
+import numpy as np
 from typing import List, Optional, Literal
 from datetime import date, datetime
 from pydantic import BaseModel, Field, field_validator, model_validator
@@ -14,6 +16,9 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# HH:MM, compiled once for every ReadingRow; single-digit hours ("9:05") are accepted
+_TIME_RE = re.compile(r"\d{1,2}:\d{2}")
+
 # --- 1. Sub-Models for Deflections ---
 
 class DeflectionData(BaseModel):
@@ -46,8 +51,8 @@ class ReadingRow(BaseModel):
     @classmethod
     def validate_time_format(cls, v):
         # Basic check to ensure time is formatted roughly correctly
-        if ":" not in v:
-            raise ValueError("Time must contain ':'")
+        if not _TIME_RE.fullmatch(v):
+            raise ValueError("Time must be in HH:MM format")
         return v
 
 # --- 3. Technical Specs (Crucial for Math) ---
@@ -79,31 +84,29 @@ class PileLoadTestReport(BaseModel):
         """
         ram_area = self.technical_specs.jack_ram_area_cm2
         
-        previous_time = None
+        logger.debug("Validating extraction for %s test (ram area %s cm²)", self.test_type, ram_area)
+
+        # A. PHYSICS CHECK: Pressure -> Load, for all rows at once
+        # Formula: Load (Tonnes) = (Pressure (kg/cm²) * Area (cm²)) / 1000
+        count = len(self.readings)
+        pressure = np.fromiter((r.pressure_gauge_reading_kg_cm2 for r in self.readings), dtype=np.float64, count=count)
+        load = np.fromiter((r.load_applied_mt for r in self.readings), dtype=np.float64, count=count)
+        calculated_load = pressure * ram_area / 1000
+        
+        # Allow 5% tolerance for rounding differences or minor gauge errors
+        mismatched = (pressure > 0) & (np.abs(calculated_load - load) > 0.05 * load) & (load > 1.0)
         
-        print(f"\n--- VALIDATING EXTRACTION FOR {self.test_type} TEST ---")
-        print(f"Using Ram Area: {ram_area} cm²\n")
-
-        for reading in self.readings:
-            # A. PHYSICS CHECK: Pressure -> Load
-            # Formula: Load (Tonnes) = (Pressure (kg/cm²) * Area (cm²)) / 1000
-            if reading.pressure_gauge_reading_kg_cm2 > 0:
-                calculated_load = (reading.pressure_gauge_reading_kg_cm2 * ram_area) / 1000
-                
-                # Allow 5% tolerance for rounding differences or minor gauge errors
-                error_margin = abs(calculated_load - reading.load_applied_mt)
-                tolerance = 0.05 * reading.load_applied_mt
-                
-                if error_margin > tolerance and reading.load_applied_mt > 1.0:
-                    logger.warning(
-                        f"Row {reading.row_id} MATH MISMATCH: "
-                        f"Pressure {reading.pressure_gauge_reading_kg_cm2} * Area {ram_area} / 1000 = {calculated_load:.2f} MT, "
-                        f"but extracted Load is {reading.load_applied_mt} MT."
-                    )
+        if mismatched.any():
+            logger.warning("\n".join(
+                f"Row {self.readings[i].row_id} MATH MISMATCH: "
+                f"Pressure {pressure[i]} * Area {ram_area} / 1000 = {calculated_load[i]:.2f} MT, "
+                f"but extracted Load is {load[i]} MT."
+                for i in np.flatnonzero(mismatched).tolist()
+            ))
             
-            # B. CHRONOLOGY CHECK
-            # Simple check to see if time moves backwards (indicates OCR reading '10:00' as '19:00' or vice versa)
-            # (Implementation omitted for brevity, but requires converting HH:MM string to datetime objects)
+        # B. CHRONOLOGY CHECK
+        # Simple check to see if time moves backwards (indicates OCR reading '10:00' as '19:00' or vice versa)
+        # (Implementation omitted for brevity, but requires converting HH:MM string to datetime objects)
             
         return self
 
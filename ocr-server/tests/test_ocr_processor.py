@@ -0,0 +1,86 @@
+"""
+Parser regression tests for PileSheetOCR.extract_from_result.
+Why: Pins header/table parsing on hand-built predict() results, with no OCR
+model needed. Run from ocr-server/: python -m unittest discover tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ocr_processor import PileSheetOCR
+
+
+def box(text, x, y, score=0.9):
+    """One predict() box: text, score and a small polygon centered on (x, y)."""
+    return text, score, [[x - 20, y - 8], [x + 20, y - 8], [x + 20, y + 8], [x - 20, y + 8]]
+
+
+def parse(boxes):
+    """Run the parser alone on a predict()-shaped result built from `boxes`."""
+    texts, scores, polys = zip(*boxes)
+    ocr = object.__new__(PileSheetOCR)
+    return ocr.extract_from_result({"rec_texts": list(texts), "rec_scores": list(scores), "rec_polys": list(polys)})
+
+
+class HeaderTableOverlapTest(unittest.TestCase):
+    """Boxes in the 200-300 band where the header and table areas overlap."""
+
+    def setUp(self):
+        self.result = parse([
+            box("PROJECT: Sewage STP", 400, 100),
+            box("TEST NO: P.12/3", 400, 150),
+            # A reading row inside the overlap band
+            box("12/03", 60, 230),
+            box("9:00", 170, 230),
+            box("120", 280, 230),
+            box("0.45", 560, 230),
+            box("0.50", 700, 230),
+            # Header text in the band that no reading claims
+            box("CONTRACTOR: ABC Infra", 1500, 280),
+            box("9:15", 170, 330),
+            box("140", 280, 330),
+            box("0.60", 560, 330),
+            box("0.65", 700, 330),
+        ])
+
+    def test_band_reading_is_parsed(self):
+        times = [reading["time"]["value"] for reading in self.result["readings"]]
+        self.assertEqual(times, ["9:00", "9:15"])
+        self.assertEqual(self.result["readings"][0]["pressure"]["value"], 120.0)
+
+    def test_band_reading_stays_out_of_header_values(self):
+        info = self.result["project_info"]
+        self.assertEqual(info["test_no"]["value"], "P.12/3 CONTRACTOR: ABC Infra")
+        self.assertEqual(info["project"]["value"], "Sewage STP TEST NO: P.12/3 CONTRACTOR: ABC Infra")
+
+    def test_unclaimed_band_text_reaches_header(self):
+        self.assertEqual(self.result["project_info"]["contractor"]["value"], "ABC Infra")
+
+
+class HeaderInReadingRowTest(unittest.TestCase):
+    """Header text at the same Y as a reading row in the overlap band."""
+
+    def setUp(self):
+        self.result = parse([
+            box("PROJECT: Sewage STP", 400, 100),
+            box("12/03", 60, 250),
+            box("9:00", 170, 250),
+            box("120", 280, 250),
+            box("0.45", 560, 250),
+            box("0.50", 700, 250),
+            # Right of the table, grouped into the reading's row
+            box("TEST NO: P.12/3", 1500, 255),
+        ])
+
+    def test_reading_is_parsed(self):
+        self.assertEqual([reading["time"]["value"] for reading in self.result["readings"]], ["9:00"])
+
+    def test_header_field_in_row_is_kept(self):
+        self.assertEqual(self.result["project_info"]["test_no"]["value"], "P.12/3")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Upload handling tests for the /extract endpoint.
+Why: /extract streams multipart bodies through its own parser
+(read_multipart_files) into spooled temp files instead of FastAPI's
+UploadFile handling. These pin multi-file parsing, the spill to disk for
+large uploads, rejection of non-multipart bodies and the page cache, with a
+stub OCR model. Run from ocr-server/: python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Keep the page cache out of /tmp/ocr-cache; main opens it at import
+_CACHE_DIR = tempfile.TemporaryDirectory()
+os.environ["OCR_CACHE_DIR"] = _CACHE_DIR.name
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+class StubOCR:
+    """Stands in for PileSheetOCR: records the pages it is asked to OCR."""
+
+    def __init__(self):
+        self.shapes = []
+
+    def extract_from_page_stream(self, pages):
+        results = []
+        for page in pages:
+            self.shapes.append(page.shape)
+            results.append({
+                "project_info": {"test_no": {"value": f"{page.shape[1]}x{page.shape[0]}", "confidence": 1.0}},
+                "readings": [{
+                    "time": {"value": f"9:{len(self.shapes):02d}", "confidence": 1.0},
+                    "pressure": {"value": 10.0, "confidence": 1.0},
+                    **{f"gauge{i}": {"value": 1.0, "confidence": 0.5} for i in range(1, 5)},
+                }],
+            })
+        return results
+
+
+class SpyTemporaryFile(main.SpooledTemporaryFile):
+    """SpooledTemporaryFile that remembers every instance, to check spills."""
+
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        SpyTemporaryFile.instances.append(self)
+
+
+def png(height, width, seed=0):
+    """PNG bytes of a random BGR image (noise barely compresses)."""
+    pixels = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    return cv2.imencode(".png", pixels)[1].tobytes()
+
+
+class ExtractUploadTest(unittest.TestCase):
+
+    def setUp(self):
+        main._ocr_cache.clear()
+        self.ocr = StubOCR()
+        main.app.state.ocr = self.ocr
+        main.app.state.ocr_error = None
+        self.client = TestClient(main.app)
+
+    def post(self, *files):
+        return self.client.post("/extract", files=[("files", (name, data, "image/png")) for name, data in files])
+
+    def test_several_files(self):
+        response = self.post(("a.png", png(40, 60, seed=1)), ("b.png", png(30, 50, seed=2)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.ocr.shapes, [(40, 60, 3), (30, 50, 3)])
+        body = response.json()
+        self.assertEqual(body["page_count"], 2)
+        self.assertEqual(body["total_readings"], 2)
+        # The first page's project info wins
+        self.assertEqual(body["project_info"]["test_no"]["value"], "60x40")
+
+    def test_large_upload_spills_to_disk(self):
+        data = png(1800, 1700, seed=3)
+        self.assertGreater(len(data), main.SPOOL_MAX_SIZE)
+        SpyTemporaryFile.instances.clear()
+        original = main.SpooledTemporaryFile
+        main.SpooledTemporaryFile = SpyTemporaryFile
+        try:
+            response = self.post(("big.png", data))
+        finally:
+            main.SpooledTemporaryFile = original
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([spool._rolled for spool in SpyTemporaryFile.instances], [True])
+        # Hashed and decoded through the mmap path, not a read() copy
+        self.assertEqual(self.ocr.shapes, [(1800, 1700, 3)])
+
+    def test_missing_boundary_is_rejected(self):
+        response = self.client.post(
+            "/extract", content=b"--x\r\n", headers={"content-type": "multipart/form-data"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.ocr.shapes, [])
+
+    def test_non_multipart_body_is_rejected(self):
+        response = self.client.post("/extract", json={"files": []})
+        self.assertEqual(response.status_code, 400)
+
+    def test_duplicate_file_hits_cache(self):
+        data = png(20, 30, seed=4)
+        first = self.post(("a.png", data), ("copy.png", data))
+        self.assertEqual(first.status_code, 200)
+        # The repeated page in one request is OCR'd once and used twice
+        self.assertEqual(self.ocr.shapes, [(20, 30, 3)])
+        self.assertEqual(first.json()["page_count"], 2)
+
+        # A later upload of the same bytes is served from the page cache
+        second = self.post(("again.png", data))
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(self.ocr.shapes, [(20, 30, 3)])
+        self.assertEqual(second.json()["project_info"], first.json()["project_info"])
+
+
+if __name__ == "__main__":
+    unittest.main()